@@ -0,0 +1,176 @@
+import math
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, jsonify, make_response, render_template, request
+from flask_login import current_user
+
+import metrics
+
+# -----------------------------------------
+# Admission Control for Expensive Endpoints
+# -----------------------------------------
+# Each protected endpoint gets a limiter with:
+#   * `concurrency` requests running at once,
+#   * a bounded wait queue of `queue` more, each waiting at most `timeout`s,
+#   * at most `per_user` requests (running or queued) per user.
+# Anything beyond that is turned away immediately with 503 (or 429 for the
+# per-user cap) and a Retry-After header, so a burst of uploads can never
+# occupy every worker thread and cheap pages keep being served.
+#
+# Limits are per process. Slots are released when the response is closed,
+# so streamed responses (exports) hold theirs until the last byte is sent.
+
+DEFAULTS = {"concurrency": 4, "queue": 8, "per_user": 2, "timeout": 5.0}
+
+
+class Rejected(Exception):
+    def __init__(self, status, reason, retry_after):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Limiter:
+    """Concurrency limit + bounded wait queue + per-user cap."""
+
+    def __init__(self, name, concurrency, queue, per_user, timeout):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = queue
+        self.per_user = per_user
+        self.timeout = timeout
+
+        self.active = 0
+        self.waiting = 0
+        self._per_user = {}
+        self._service_time = 1.0   # EWMA of seconds per request, for Retry-After
+        self._cond = threading.Condition()
+
+        metrics.register_gauge(f"admission.{name}.in_flight", lambda: self.active)
+        metrics.register_gauge(f"admission.{name}.waiting", lambda: self.waiting)
+
+    def retry_after(self) -> int:
+        """Rough seconds until a slot frees up: queue ahead x service time."""
+        backlog = (self.waiting + 1) / max(self.concurrency, 1)
+        return max(1, math.ceil(backlog * self._service_time))
+
+    def _reject(self, status, reason):
+        metrics.inc(f"admission.{self.name}.rejected.{reason}")
+        return Rejected(status, reason, self.retry_after())
+
+    def acquire(self, user_key):
+        """Blocks until admitted; raises Rejected. Returns the admission time."""
+        with self._cond:
+            if self.per_user and self._per_user.get(user_key, 0) >= self.per_user:
+                raise self._reject(429, "per_user")
+
+            if self.active >= self.concurrency:
+                if self.waiting >= self.max_queue:
+                    raise self._reject(503, "queue_full")
+
+                self.waiting += 1
+                self._per_user[user_key] = self._per_user.get(user_key, 0) + 1
+                started = time.perf_counter()
+                admitted = self._cond.wait_for(lambda: self.active < self.concurrency, self.timeout)
+                self.waiting -= 1
+                waited = time.perf_counter() - started
+                metrics.inc(f"admission.{self.name}.queued")
+                metrics.inc(f"admission.{self.name}.queue_wait_ms", round(waited * 1000))
+
+                if not admitted:
+                    self._release_user(user_key)
+                    raise self._reject(503, "timeout")
+            else:
+                self._per_user[user_key] = self._per_user.get(user_key, 0) + 1
+
+            self.active += 1
+            metrics.inc(f"admission.{self.name}.admitted")
+            return time.perf_counter()
+
+    def release(self, user_key, admitted_at):
+        with self._cond:
+            self.active -= 1
+            self._release_user(user_key)
+            elapsed = time.perf_counter() - admitted_at
+            self._service_time = 0.8 * self._service_time + 0.2 * elapsed
+            self._cond.notify()
+
+    def _release_user(self, user_key):
+        count = self._per_user.get(user_key, 0) - 1
+        if count > 0:
+            self._per_user[user_key] = count
+        else:
+            self._per_user.pop(user_key, None)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name) -> Limiter:
+    """Returns the limiter for `name`, built from DEFAULTS + ADMISSION_LIMITS[name]."""
+    limiter = _limiters.get(name)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(name)
+            if limiter is None:
+                settings = dict(DEFAULTS)
+                settings.update(current_app.config.get("ADMISSION_LIMITS", {}).get(name, {}))
+                limiter = _limiters[name] = Limiter(name, **settings)
+    return limiter
+
+
+def _rejection_response(rejected):
+    message = ("You already have requests in progress. Please wait for them to finish."
+               if rejected.reason == "per_user"
+               else "The server is busy processing other requests. Please try again shortly.")
+
+    if request.is_json or request.accept_mimetypes.best == "application/json":
+        response = make_response(jsonify({"error": message}), rejected.status)
+    else:
+        response = make_response(
+            render_template(
+                "errors/503.html",
+                status=rejected.status,
+                title="Too Many Requests" if rejected.status == 429 else "Server Busy",
+                message=message,
+                retry_after=rejected.retry_after,
+            ),
+            rejected.status,
+        )
+    response.headers["Retry-After"] = str(rejected.retry_after)
+    return response
+
+
+def admission_control(name, methods=("POST",)):
+    """
+    Limits concurrent `methods` requests to the decorated view (see module
+    notes). Other methods, e.g. the GET that renders an upload form, pass.
+    Disabled entirely with ADMISSION_ENABLED = False.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in methods or not current_app.config.get("ADMISSION_ENABLED", True):
+                return view(*args, **kwargs)
+
+            limiter = get_limiter(name)
+            user_key = current_user.get_id() if current_user.is_authenticated else request.remote_addr
+            try:
+                admitted_at = limiter.acquire(user_key)
+            except Rejected as rejected:
+                current_app.logger.warning(f"Admission rejected ({name}, {rejected.reason})")
+                return _rejection_response(rejected)
+
+            try:
+                response = make_response(view(*args, **kwargs))
+            except BaseException:
+                limiter.release(user_key, admitted_at)
+                raise
+            response.call_on_close(lambda: limiter.release(user_key, admitted_at))
+            return response
+        return wrapper
+    return decorator
@@ -5,15 +5,17 @@ from flask_mail import Mail, Message
 from config import Config
 import os
 import secrets
-import logging
-from logging.handlers import RotatingFileHandler
 import sys
+import threading
 
 # Add the current directory to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Import models after setting the path
-from model import db, User
+from model import db
+from user_cache import user_cache, init_app as init_user_cache
+from log_pipeline import init_logging, init_request_logging
+import render_cache
 
 # -------------------------------------------------
 # Create Flask app
@@ -28,16 +30,10 @@ if not app.config.get('MAIL_DEFAULT_SENDER'):
 # -------------------------------------------------
 # Configure Logging
 # -------------------------------------------------
-if not app.debug:
-    if not os.path.exists('logs'):
-        os.mkdir('logs')
-    file_handler = RotatingFileHandler('logs/ai_recruiting.log', maxBytes=10240, backupCount=10)
-    file_handler.setFormatter(logging.Formatter(
-        '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'))
-    file_handler.setLevel(logging.INFO)
-    app.logger.addHandler(file_handler)
-    app.logger.setLevel(logging.INFO)
-    app.logger.info('AI Recruiting System startup')
+# File writes, rotation and JSON formatting run on a background thread;
+# request threads only enqueue (see log_pipeline.py). The file writer is
+# attached at startup (below), so only serving processes rotate the log.
+init_request_logging(app)
 
 # -------------------------------------------------
 # Initialize Extensions
@@ -50,12 +46,17 @@ login_manager.init_app(app)
 
 mail = Mail(app)
 
+init_user_cache(app)
+render_cache.init_app(app)
+
 # -------------------------------------------------
 # Flask-Login: User Loader
 # -------------------------------------------------
+# Served from a short-TTL per-process cache of immutable snapshots,
+# so authenticated requests normally skip the database entirely.
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return user_cache.get(int(user_id))
 
 
 # -------------------------------------------------
@@ -82,9 +83,56 @@ from b_routes import *
 # -------------------------------------------------
 # Create DB Tables
 # -------------------------------------------------
-with app.app_context():
+def init_database():
+    """Creates missing tables. Needs an app context; CLIs call it themselves."""
     db.create_all()
 
+    # Full-text resume search table (FTS5 on SQLite, tsvector on PostgreSQL)
+    from resume_search import init_search_tables
+    init_search_tables()
+
+# -------------------------------------------------
+# Startup Work (first request only)
+# -------------------------------------------------
+# CLIs (bulk_ingest, maintenance, migrate_db) and the bulk-import scoring
+# workers import this module too. They must not attach the log file writer
+# or claim and score interview segments, so all startup work waits for the
+# first request a serving process handles.
+_startup_lock = threading.Lock()
+_startup_done = False
+
+
+@app.before_request
+def _startup_once():
+    global _startup_done
+    if _startup_done:
+        return
+    with _startup_lock:
+        if _startup_done:
+            return
+
+        if not app.debug:
+            init_logging(app)
+            app.logger.info('AI Recruiting System startup')
+
+        init_database()
+
+        # Pick up interview segments left unscored by a previous run
+        from interview_engine import requeue_pending_segments
+        try:
+            requeue_pending_segments()
+        except Exception as e:
+            # e.g. a schema that predates migrate_db.py; the app still has to start
+            db.session.rollback()
+            app.logger.error(f"Could not requeue interview segments: {str(e)}")
+
+        _startup_done = True
+
+# Periodic storage GC and database compaction, started by the first request
+# this process serves (see maintenance.py)
+from maintenance import start_scheduler
+start_scheduler(app)
+
 # -------------------------------------------------
 # Run the Application
 # -------------------------------------------------
@@ -1,16 +1,29 @@
-from flask import render_template, redirect, request, flash, url_for, send_from_directory, session, abort
+from flask import render_template, redirect, request, flash, url_for, send_from_directory, session, abort, jsonify, Response, stream_with_context
 from flask_login import login_required, login_user, logout_user, current_user
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.exc import IntegrityError
 from app import app, db, mail
-from data_loader import ai_shortlist_candidates, ai_shortlist_csv
-from utils import process_resume, transcribe_video, score_interview, send_email
-from model import User, Application, Interview
+from data_loader import analyze_resume, ai_shortlist_csv, skill_mask_for
+from utils import process_resume, send_email
+from interview_engine import get_backend, submit_segment
+from ranking_engine import get_index
+from bulk_ingest import ingest, iter_zip_entries
+from dedupe import minhash_signature, find_duplicates, index_signature, release_duplicates
+from resume_search import index_resume, search_resumes
+from log_pipeline import stage
+from admission import admission_control
+from render_cache import cached_page
+from maintenance import remove_unreferenced_uploads
+from export import APPLICATION_COLUMNS, application_rows, shortlist_header, shortlist_rows, stream_csv, stream_xlsx, xlsx_available
+from model import User, Application, Interview, InterviewSegment
+import metrics
 import os
 import re
 from datetime import datetime, timedelta
 import sys
 import secrets
+import zipfile
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
@@ -202,8 +215,13 @@ def logout():
 @app.route("/dashboard")
 @login_required
 def dashboard():
-    applications = Application.query.filter_by(user_id=current_user.id).all()
-    return render_template("dashboard.html", applications=applications)
+    user_id = current_user.id
+
+    def render():
+        applications = Application.query.filter_by(user_id=user_id).all()
+        return render_template("dashboard.html", applications=applications)
+
+    return cached_page(("dashboard", user_id), ("application", "interview"), render)
 
 
 ############################################################################################################################
@@ -212,6 +230,7 @@ def dashboard():
 # ------------------------------
 @app.route("/upload", methods=["GET", "POST"])
 @login_required
+@admission_control("upload")
 def upload():
     if request.method == "POST":
         job_position = request.form["job_position"]
@@ -225,9 +244,20 @@ def upload():
         path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
         file.save(path)
 
-        # Extract text and get AI Score
-        resume_text = process_resume(path)
-        decision, confidence = ai_shortlist_candidates(resume_text)
+        # Extract text and look for a near-duplicate of an earlier resume
+        with stage("extract"):
+            resume_text = process_resume(path)
+        with stage("dedupe"):
+            signature = minhash_signature(resume_text)
+            duplicates = find_duplicates(signature)
+            original = duplicates[0][0] if duplicates else None
+
+        # Get AI Score. Always re-scored, even for a duplicate: MinHash only
+        # estimates similarity, so an identical signature can still hide an
+        # added skill, and scoring is cheap next to the text extraction.
+        with stage("score"):
+            analysis = analyze_resume(resume_text)
+            confidence = analysis["total_score"]
 
         # Create Application
         application = Application(
@@ -235,11 +265,30 @@ def upload():
             job_position=job_position,
             resume_file=filename,
             resume_score=confidence, 
-            status="Submitted"
+            status="Submitted",
+            minhash=signature,
+            duplicate_of_id=(original.duplicate_of_id or original.id) if original else None,
+            skill_mask=analysis["skill_mask"],
+            skill_score=analysis["skill_score"],
+            experience_score=analysis["experience_score"],
+            qualification_score=analysis["qualification_score"]
         )
 
-        db.session.add(application)
-        db.session.commit()
+        with stage("store"):
+            db.session.add(application)
+            db.session.flush()
+            index_signature(application.id, signature)
+            index_resume(application.id, resume_text)
+            db.session.commit()
+
+        # Make the resume searchable by job description
+        with stage("rank_index"):
+            try:
+                resume_index = get_index()
+                resume_index.add(application.id, resume_text)
+                resume_index.flush()
+            except Exception as e:
+                app.logger.error(f"Ranking index error: {str(e)}")
 
         flash("Resume uploaded successfully!", "success")
 
@@ -273,6 +322,11 @@ def interview(app_id):
             flash("No interview data received.", "error")
             return redirect(url_for("dashboard"))
 
+        # Already started through /segments (or submitted before): one per application
+        if application.interview:
+            flash("An interview has already been recorded for this application.", "error")
+            return redirect(url_for("dashboard"))
+
         filename = secure_filename(video_file.filename)
         # Ensure unique filename
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -282,8 +336,9 @@ def interview(app_id):
         video_file.save(video_path)
 
         # Transcribe and Score (Scoring is the same)
-        text = transcribe_video(video_path)
-        interview_score = score_interview(text)
+        backend = get_backend()
+        text = backend.transcribe(video_path)
+        interview_score = backend.score(text)
 
         # Save Interview Record
         interview = Interview(
@@ -298,12 +353,169 @@ def interview(app_id):
         # Update Application Status
         application.status = "Under Review"
         
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another request created the interview while this one was scoring
+            db.session.rollback()
+            remove_unreferenced_uploads([filename], app.config['UPLOAD_FOLDER'])
+            flash("An interview has already been recorded for this application.", "error")
+            return redirect(url_for("dashboard"))
 
         flash("Interview submitted successfully!", "success")
         return redirect(url_for("dashboard"))
 
-    return render_template("interview.html", job_position=application.job_position)
+    return render_template("interview.html", job_position=application.job_position, app_id=app_id)
+
+
+# ------------------------------
+# Interview Segments (One Upload per Question)
+# ------------------------------
+@app.route("/interview/<int:app_id>/segments", methods=["GET", "POST"])
+@login_required
+def interview_segments(app_id):
+    """
+    GET:  Lists the segments already received so an interrupted
+          interview can resume where it left off.
+    POST: Appends one recorded answer ('video' + 'segment_index').
+          Scoring runs on the worker pool; this returns immediately.
+    """
+    application = Application.query.get_or_404(app_id)
+
+    if application.user_id != current_user.id:
+        return jsonify({"error": "Unauthorized access"}), 403
+
+    interview = application.interview
+
+    if request.method == "GET":
+        segments = interview.segments if interview else []
+        return jsonify({
+            "received": [s.segment_index for s in segments if s.status != "Failed"],
+            "scored": interview.video_count if interview else 0,
+            "interview_score": interview.interview_score if interview else None,
+            "finished": application.status == "Under Review",
+        })
+
+    if application.status == "Under Review":
+        return jsonify({"error": "Interview already submitted"}), 409
+
+    video_file = request.files.get("video")
+    try:
+        segment_index = int(request.form.get("segment_index", ""))
+    except ValueError:
+        segment_index = -1
+
+    if not video_file or not 0 <= segment_index < app.config["INTERVIEW_MAX_SEGMENTS"]:
+        return jsonify({"error": "A video and a valid segment_index are required"}), 400
+
+    if interview is None:
+        interview = Interview(application_id=app_id, interview_score=0.0, video_count=0)
+        db.session.add(interview)
+        try:
+            db.session.flush()
+        except IntegrityError:
+            # A concurrent POST for another answer created it first
+            db.session.rollback()
+            interview = Interview.query.filter_by(application_id=app_id).one()
+
+    segment = InterviewSegment.query.filter_by(
+        interview_id=interview.id, segment_index=segment_index
+    ).first()
+
+    retake = request.form.get("retake") == "1"
+    replaced_file = None
+
+    if segment and segment.status != "Failed":
+        if not retake:
+            # Re-sending a segment we already have is a no-op (safe client retries)
+            db.session.commit()
+            return jsonify({"segment_index": segment_index, "status": segment.status}), 200
+
+        # Claim the scored answer, so two concurrent retakes cannot both
+        # subtract it from the average
+        claimed = db.session.execute(
+            db.update(InterviewSegment)
+            .where(InterviewSegment.id == segment.id, InterviewSegment.status == "Scored")
+            .values(status="Pending")
+        ).rowcount
+        if not claimed:
+            # Still being scored (the worker would fold the old recording in
+            # after we replace it), or another retake is in progress
+            db.session.rollback()
+            return jsonify({"error": "The previous recording of this answer is still being "
+                                     "processed. Please try again in a moment."}), 409
+
+        # Take the old answer back out of the running average and transcript
+        db.session.execute(
+            db.update(Interview)
+            .where(Interview.id == interview.id)
+            .values(
+                interview_score=db.case(
+                    (Interview.video_count > 1,
+                     (Interview.interview_score * Interview.video_count - segment.score)
+                     / (Interview.video_count - 1)),
+                    else_=0.0,
+                ),
+                video_count=Interview.video_count - 1,
+                interview_text=db.func.replace(
+                    Interview.interview_text, f"[Q{segment_index + 1}] {segment.transcript}\n", ""
+                ),
+            )
+        )
+        replaced_file = segment.video_file
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"interview_{app_id}_q{segment_index}_{timestamp}.webm"
+    video_file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
+
+    if segment is None:
+        segment = InterviewSegment(interview_id=interview.id, segment_index=segment_index)
+        db.session.add(segment)
+    segment.video_file = filename
+    segment.status = "Pending"
+    segment.score = None
+    segment.transcript = None
+    segment.claimed_at = None
+    interview_id = interview.id
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent POST stored this answer first: same as a re-send
+        db.session.rollback()
+        remove_unreferenced_uploads([filename], app.config['UPLOAD_FOLDER'])
+        segment = InterviewSegment.query.filter_by(
+            interview_id=interview_id, segment_index=segment_index
+        ).one()
+        return jsonify({"segment_index": segment_index, "status": segment.status}), 200
+
+    if replaced_file:
+        remove_unreferenced_uploads([replaced_file], app.config['UPLOAD_FOLDER'])
+
+    submit_segment(segment.id)
+
+    return jsonify({"segment_index": segment_index, "status": segment.status}), 202
+
+
+# ------------------------------
+# Finish Segmented Interview
+# ------------------------------
+@app.route("/interview/<int:app_id>/finish", methods=["POST"])
+@login_required
+def finish_interview(app_id):
+    application = Application.query.get_or_404(app_id)
+
+    if application.user_id != current_user.id:
+        return jsonify({"error": "Unauthorized access"}), 403
+
+    if not application.interview or not application.interview.segments:
+        return jsonify({"error": "Please record at least one answer."}), 400
+
+    # The score is already a running average; nothing left to compute here
+    application.status = "Under Review"
+    db.session.commit()
+
+    flash("Interview submitted successfully!", "success")
+    return jsonify({"redirect": url_for("dashboard")})
 ###########################################################################################################################
 
 
@@ -316,8 +528,22 @@ def recruiter_dashboard():
     if current_user.user_type != 'recruiter':
         abort(403)
         
-    applications = Application.query.all()
-    return render_template("recruiter_dashboard.html", applications=applications)
+    # Optional skill filter, e.g. ?skills=python,docker,master
+    skills = request.args.get("skills", "")
+    try:
+        mask = skill_mask_for(skills.split(","))
+    except ValueError as e:
+        flash(str(e), "error")
+        mask = 0
+
+    def render():
+        if mask:
+            applications = Application.with_all_skills(mask).all()
+        else:
+            applications = Application.query.all()
+        return render_template("recruiter_dashboard.html", applications=applications, skills=skills)
+
+    return cached_page(("recruiter_dashboard", mask, skills), ("application", "interview"), render)
 
 
 # ------------------------------
@@ -325,6 +551,7 @@ def recruiter_dashboard():
 # ------------------------------
 @app.route("/shortlist-csv")
 @login_required
+@admission_control("shortlist", methods=("GET",))
 def shortlist_csv():
     if current_user.user_type != 'recruiter':
         abort(403)
@@ -348,6 +575,188 @@ def shortlist_csv():
     )
 
 
+# ------------------------------
+# Streaming Exports (Recruiter)
+# ------------------------------
+def _export_response(header, rows, basename, title):
+    """Streams `rows` as CSV (default) or XLSX depending on ?format=."""
+    fmt = request.args.get("format", "csv").lower()
+    stamp = datetime.now().strftime("%Y%m%d_%H%M")
+
+    if fmt == "xlsx":
+        if not xlsx_available():
+            flash("XLSX export needs the openpyxl package. Please export as CSV.", "error")
+            return redirect(request.referrer or url_for("recruiter_dashboard"))
+        body = stream_xlsx(header, rows, title=title)
+        mimetype = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    else:
+        fmt = "csv"
+        body = stream_csv(header, rows)
+        mimetype = "text/csv"
+
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{basename}_{stamp}.{fmt}"'
+    return response
+
+
+@app.route("/export/applications")
+@login_required
+@admission_control("export", methods=("GET",))
+def export_applications():
+    if current_user.user_type != 'recruiter':
+        abort(403)
+
+    try:
+        mask = skill_mask_for(request.args.get("skills", "").split(","))
+    except ValueError as e:
+        flash(str(e), "error")
+        return redirect(url_for("recruiter_dashboard"))
+
+    rows = application_rows(
+        job=request.args.get("job") or None,
+        status=request.args.get("status") or None,
+        min_score=request.args.get("min_score", type=float),
+        max_score=request.args.get("max_score", type=float),
+        skill_mask=mask,
+    )
+    header = [name for name, _ in APPLICATION_COLUMNS]
+    return _export_response(header, rows, "applications", "Applications")
+
+
+@app.route("/export/shortlist")
+@login_required
+@admission_control("export", methods=("GET",))
+def export_shortlist():
+    if current_user.user_type != 'recruiter':
+        abort(403)
+
+    csv_path = os.path.join(app.root_path, "data", "final_merged_dataset2.csv")
+    job_role = request.args.get("job", "Data Scientist")
+
+    try:
+        header = shortlist_header(csv_path)
+    except Exception as e:
+        flash(f"CSV processing failed: {str(e)}", "error")
+        return redirect(url_for("recruiter_dashboard"))
+
+    rows = shortlist_rows(
+        csv_path,
+        job_role,
+        min_score=request.args.get("min_score", type=float),
+        max_score=request.args.get("max_score", type=float),
+    )
+    return _export_response(header, rows, "shortlist", "Shortlist")
+
+
+# ------------------------------
+# Job Description Ranking (Recruiter)
+# ------------------------------
+@app.route("/rank", methods=["GET", "POST"])
+@login_required
+def rank_candidates():
+    if current_user.user_type != 'recruiter':
+        abort(403)
+
+    job_description = request.form.get("job_description", "")
+    k = min(max(request.form.get("k", 20, type=int), 1), 200)
+
+    results = []
+    if job_description.strip():
+        ranked = get_index().top_k(job_description, k)
+        applications = {
+            a.id: a for a in Application.query.filter(Application.id.in_([i for i, _ in ranked])).all()
+        }
+        results = [(applications[i], score) for i, score in ranked if i in applications]
+
+    return render_template("rank.html", job_description=job_description, k=k, results=results)
+
+
+# ------------------------------
+# Resume Full-Text Search (Recruiter)
+# ------------------------------
+@app.route("/search")
+@login_required
+def search():
+    if current_user.user_type != 'recruiter':
+        abort(403)
+
+    query = request.args.get("q", "").strip()
+    page = max(request.args.get("page", 1, type=int), 1)
+
+    results, has_next = [], False
+    if query:
+        results, has_next = search_resumes(query, page=page, per_page=20)
+        applications = {
+            a.id: a for a in Application.query.filter(
+                Application.id.in_([r["application_id"] for r in results])
+            ).all()
+        }
+        for result in results:
+            result["application"] = applications.get(result["application_id"])
+        results = [r for r in results if r["application"] is not None]
+
+    return render_template("search.html", query=query, page=page, results=results, has_next=has_next)
+
+
+# ------------------------------
+# Bulk Resume Import (Recruiter)
+# ------------------------------
+@app.route("/recruiter/bulk-upload", methods=["GET", "POST"])
+@login_required
+@admission_control("bulk_upload")
+def bulk_upload():
+    if current_user.user_type != 'recruiter':
+        abort(403)
+
+    if request.method == "POST":
+        job_position = request.form.get("job_position", "").strip()
+        archive = request.files.get("archive")
+
+        if not job_position or not archive or not archive.filename.lower().endswith(".zip"):
+            flash("Choose a job position and a .zip file of resumes.", "error")
+            return redirect(url_for("bulk_upload"))
+
+        # Runs inside the request; live progress is only reported by the CLI
+        # (python bulk_ingest.py), which is meant for very large archives.
+        try:
+            summary = ingest(
+                iter_zip_entries(archive.stream),
+                current_user.id,
+                job_position,
+                app.config['UPLOAD_FOLDER'],
+                workers=app.config.get('BULK_INGEST_WORKERS'),
+            )
+        except zipfile.BadZipFile:
+            flash("That file is not a valid ZIP archive.", "error")
+            return redirect(url_for("bulk_upload"))
+
+        app.logger.info(
+            f"Bulk import by {current_user.email}: {summary['imported']}/{summary['processed']} "
+            f"in {summary['elapsed']:.1f}s ({summary['files_per_sec']:.1f} files/s)"
+        )
+        flash(f"Imported {summary['imported']} of {summary['processed']} resumes "
+              f"in {summary['elapsed']:.1f}s.", "success")
+        for name, error in summary["failed"][:20]:
+            flash(f"Skipped {name}: {error}", "warning")
+        if len(summary["failed"]) > 20:
+            flash(f"... and {len(summary['failed']) - 20} more skipped files.", "warning")
+        return redirect(url_for("recruiter_dashboard"))
+
+    return render_template("bulk_upload.html")
+
+
+# ------------------------------
+# Metrics (Recruiter)
+# ------------------------------
+@app.route("/metrics")
+@login_required
+def metrics_view():
+    if current_user.user_type != 'recruiter':
+        abort(403)
+
+    return jsonify(metrics.snapshot())
+
+
 # ------------------------------
 # Serve Uploaded Files
 # ------------------------------
@@ -374,14 +783,25 @@ def delete_application(app_id):
         return redirect(url_for('dashboard'))
     
     try:
-        # Delete the application (Cascade delete might handle interviews in model, 
-        # or we handle manually if needed. Usually DB handles relations if set up).
-        # For safety in SQLite/SQLAlchemy, deleting the parent usually deletes children 
-        # if 'delete-orphan' is set or cascade is configured in model.py.
-        # Assuming Application deletes Interview automatically or we can let it be:
-        
+        # The interview, its segments and the LSH bands go with it (cascades in model.py)
+        files = [application.resume_file]
+        if application.interview:
+            files += [s.video_file for s in application.interview.segments]
+
+        release_duplicates(application.id)
         db.session.delete(application)
         db.session.commit()
+
+        try:
+            resume_index = get_index()
+            resume_index.remove(app_id)
+            resume_index.flush()
+        except Exception as e:
+            app.logger.error(f"Ranking index error: {str(e)}")
+
+        # Anything missed here (e.g. legacy single-file interviews) is picked
+        # up by the periodic sweep in maintenance.py
+        remove_unreferenced_uploads(files, app.config['UPLOAD_FOLDER'])
         
         flash("Application deleted successfully.", "success")
     except Exception as e:
@@ -0,0 +1,87 @@
+"""
+Latency benchmark for the job-description ranking engine.
+
+Builds synthetic resume matrices (Zipf-distributed terms, similar in shape to
+real hashed resumes) and times top-k queries against them, then times queries
+interleaved with appends (one new resume before every query, as when uploads
+arrive while recruiters search):
+
+    python bench_ranking.py                 # 100k and 1M resumes
+    python bench_ranking.py 250000 --k 50 --appends 500
+"""
+import argparse
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from ranking_engine import ResumeIndex, N_FEATURES
+
+SAMPLE_JOB = (
+    "Senior data scientist with 5 years of experience in python, pandas, "
+    "machine learning, deep learning, sql and aws. Masters degree preferred."
+)
+
+
+def synthetic_rows(n_rows, terms_per_row=200, n_features=N_FEATURES, seed=0, chunk=100_000):
+    """Yields L2-normalized CSR blocks of `chunk` rows each."""
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_rows, chunk):
+        rows = min(chunk, n_rows - start)
+        cols = (rng.zipf(1.1, size=rows * terms_per_row) - 1) % n_features
+        indptr = np.arange(0, rows * terms_per_row + 1, terms_per_row)
+        block = sp.csr_matrix(
+            (np.ones(len(cols), dtype=np.float32), cols.astype(np.int32), indptr),
+            shape=(rows, n_features),
+        )
+        block.sum_duplicates()
+        block.data = 1.0 + np.log(block.data)
+        norms = np.sqrt(block.multiply(block).sum(axis=1)).A1
+        block = sp.csr_matrix(sp.diags(1.0 / norms).dot(block), dtype=np.float32)
+        yield np.arange(start, start + rows), block
+
+
+def _summary(timings):
+    return f"p50 {np.percentile(timings, 50):7.2f} ms | p95 {np.percentile(timings, 95):7.2f} ms"
+
+
+def run(n_rows, k, repeats, appends):
+    index = ResumeIndex()
+    t0 = time.perf_counter()
+    for ids, block in synthetic_rows(n_rows):
+        index.add_vectors(ids, block)
+    # Real resume text for the job description, so the query hits real hash buckets
+    index.add(n_rows, SAMPLE_JOB)
+    index.compact()  # one consolidated base, as a server starts out after loading
+    build = time.perf_counter() - t0
+
+    timings = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        index.top_k(SAMPLE_JOB, k)
+        timings.append((time.perf_counter() - t0) * 1000)
+
+    print(f"{n_rows:>9,} resumes | nnz {index._base_matrix.nnz:>12,} | build {build:6.1f}s | "
+          f"top-{k} {_summary(timings)}")
+
+    if appends:
+        _, fresh = next(synthetic_rows(appends, seed=1, chunk=appends))
+        timings = []
+        for i in range(appends):
+            index.add_vectors([n_rows + 1 + i], fresh[i])
+            t0 = time.perf_counter()
+            index.top_k(SAMPLE_JOB, k)
+            timings.append((time.perf_counter() - t0) * 1000)
+        print(f"{'':>9} + {appends} appends, a query after each     | top-{k} {_summary(timings)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sizes", nargs="*", type=int, default=[100_000, 1_000_000])
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--appends", type=int, default=200, help="Appends mixed with queries (0 to skip)")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args.k, args.repeats, args.appends)
@@ -0,0 +1,309 @@
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from data_loader import analyze_resume
+from dedupe import minhash_signature
+from utils import process_resume_stream
+
+# -----------------------------------------
+# Bulk Resume Ingestion (Recruiters)
+# -----------------------------------------
+# Resumes are read one at a time from a ZIP archive (or a directory), scored
+# on a process pool, and written to the database in batches. A file that
+# cannot be read or scored is reported and skipped; the rest of the batch
+# carries on.
+
+RESUME_EXTENSIONS = (".pdf", ".docx")
+MAX_ENTRY_BYTES = 20 * 1024 * 1024  # ignore anything larger (zip bombs, scans)
+
+# Workers are started fresh rather than forked: the web server is threaded, and
+# forking it can copy locks held by other threads (logging, DB pool) into the child
+_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def iter_zip_entries(fileobj):
+    """
+    Yields (name, bytes) for each resume in a ZIP archive. Entries are read
+    into memory one by one; nothing is extracted to disk.
+    """
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or "__MACOSX" in name or not name.lower().endswith(RESUME_EXTENSIONS):
+                continue
+            if info.file_size > MAX_ENTRY_BYTES:
+                yield name, None
+                continue
+            try:
+                yield name, archive.read(info)
+            except (zipfile.BadZipFile, zipfile.LargeZipFile, OSError, RuntimeError) as e:
+                print(f"ZIP read error ({name}): {e}")
+                yield name, None
+
+
+def iter_directory(path):
+    """Yields (name, bytes) for each resume under a directory."""
+    for root, _, files in os.walk(path):
+        for filename in sorted(files):
+            if not filename.lower().endswith(RESUME_EXTENSIONS):
+                continue
+            full_path = os.path.join(root, filename)
+            if os.path.getsize(full_path) > MAX_ENTRY_BYTES:
+                yield os.path.relpath(full_path, path), None
+                continue
+            with open(full_path, "rb") as f:
+                yield os.path.relpath(full_path, path), f.read()
+
+
+def score_entry(name, data):
+    """
+    Process-pool worker: extracts and scores one resume.
+    Never raises; failures come back as {"error": ...}.
+    """
+    try:
+        text = process_resume_stream(io.BytesIO(data), name)
+        if not text:
+            return {"name": name, "error": "No text could be extracted"}
+        return {
+            "name": name,
+            "text": text,
+            "analysis": analyze_resume(text),
+            "signature": minhash_signature(text),
+        }
+    except Exception as e:
+        return {"name": name, "error": str(e)}
+
+
+def _score_isolated(name, data):
+    """Scores one file in a throwaway single-worker pool."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=_MP_CONTEXT) as executor:
+        try:
+            return executor.submit(score_entry, name, data).result()
+        except BrokenProcessPool:
+            return {"name": name, "error": "Worker crashed while reading this file"}
+
+
+# -----------------------------------------
+# Batch Writer
+# -----------------------------------------
+def _store_batch(results, recruiter_id, job_position):
+    """
+    Inserts one batch of scored resumes with a single commit. Duplicates are
+    looked up once against stored resumes and, for resumes repeated inside
+    the batch, through an in-memory map of the batch's band buckets; the rows
+    are then added and flushed together and their bands bulk-inserted.
+    """
+    from model import db, Application
+    from dedupe import (DUPLICATE_THRESHOLD, band_buckets, estimate_similarity,
+                        find_duplicates, index_signatures)
+    from resume_search import index_resume
+    from ranking_engine import get_index
+
+    # Position in the batch of each resume's original, if it repeats an earlier one
+    batch_buckets = {}
+    batch_originals = []
+    applications = []
+    for position, result in enumerate(results):
+        analysis = result["analysis"]
+        signature = result["signature"]
+        duplicates = find_duplicates(signature)
+        original = duplicates[0][0] if duplicates else None
+
+        batch_original = None
+        if signature is not None:
+            buckets = list(band_buckets(signature))
+            if original is None:
+                candidates = sorted({p for key in buckets for p in batch_buckets.get(key, ())})
+                for candidate in candidates:
+                    if estimate_similarity(signature, results[candidate]["signature"]) >= DUPLICATE_THRESHOLD:
+                        batch_original = batch_originals[candidate]
+                        if batch_original is None:
+                            batch_original = candidate
+                        break
+            for key in buckets:
+                batch_buckets.setdefault(key, []).append(position)
+        batch_originals.append(batch_original)
+
+        applications.append(Application(
+            user_id=recruiter_id,
+            job_position=job_position,
+            resume_file=result["stored_as"],
+            resume_score=analysis["total_score"],
+            status="Imported",
+            minhash=signature,
+            duplicate_of_id=(original.duplicate_of_id or original.id) if original else None,
+            skill_mask=analysis["skill_mask"],
+            skill_score=analysis["skill_score"],
+            experience_score=analysis["experience_score"],
+            qualification_score=analysis["qualification_score"],
+        ))
+
+    db.session.add_all(applications)
+    db.session.flush()
+    for application, batch_original in zip(applications, batch_originals):
+        if batch_original is not None:
+            root = applications[batch_original]
+            application.duplicate_of_id = root.duplicate_of_id or root.id
+    index_signatures((a.id, r["signature"]) for a, r in zip(applications, results))
+    for application, result in zip(applications, results):
+        index_resume(application.id, result["text"])
+    db.session.commit()
+
+    resume_index = get_index()
+    resume_index.add_many([a.id for a in applications], [r["text"] for r in results])
+    resume_index.flush()
+
+
+def ingest(entries, recruiter_id, job_position, upload_folder,
+           workers=None, batch_size=100, progress=None):
+    """
+    Scores `entries` ((name, bytes) pairs) across a process pool and stores
+    them as Applications owned by `recruiter_id`. Must run in an app context.
+
+    progress(done, imported, failed, files_per_sec) is called after each file.
+    Returns a summary dict.
+    """
+    batch_id = uuid.uuid4().hex[:8]
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 4
+
+    started = time.perf_counter()
+    done = imported = 0
+    failed = []
+    pending_batch = []
+    in_flight = {}
+
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=_MP_CONTEXT)
+
+    def submit(name, data, stored_as):
+        nonlocal executor
+        try:
+            future = executor.submit(score_entry, name, data)
+        except BrokenProcessPool:
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=_MP_CONTEXT)
+            future = executor.submit(score_entry, name, data)
+        in_flight[future] = (name, stored_as)
+
+    def collect(finished):
+        nonlocal done, imported
+        for future in finished:
+            name, stored_as = in_flight.pop(future)
+            stored_path = os.path.join(upload_folder, stored_as)
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                # A worker died (e.g. a malformed PDF crashed the parser), which
+                # fails every file in flight. Re-score each on its own so only
+                # the file that actually crashes is reported.
+                with open(stored_path, "rb") as f:
+                    result = _score_isolated(name, f.read())
+            except Exception as e:
+                result = {"error": str(e)}
+
+            done += 1
+            if "error" in result:
+                failed.append((name, result["error"]))
+                os.remove(stored_path)
+            else:
+                result["stored_as"] = stored_as
+                pending_batch.append(result)
+
+            if len(pending_batch) >= batch_size:
+                _store_batch(pending_batch, recruiter_id, job_position)
+                imported += len(pending_batch)
+                pending_batch.clear()
+
+            if progress:
+                progress(done, imported, len(failed), done / max(time.perf_counter() - started, 1e-9))
+
+    try:
+        for position, (name, data) in enumerate(entries):
+            if data is None:
+                done += 1
+                failed.append((name, "Unreadable or too large"))
+                continue
+
+            # Keep a copy in uploads/ so recruiters can download the original. The
+            # entry name is not reused: secure_filename() strips non-ASCII names
+            # (e.g. 履歴書.docx) down to nothing, extension included.
+            stored_as = f"bulk_{batch_id}_{position}{os.path.splitext(name)[1].lower()}"
+            with open(os.path.join(upload_folder, stored_as), "wb") as f:
+                f.write(data)
+            submit(name, data, stored_as)
+
+            if len(in_flight) >= max_in_flight:
+                finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                collect(finished)
+
+        while in_flight:
+            finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            collect(finished)
+
+        if pending_batch:
+            _store_batch(pending_batch, recruiter_id, job_position)
+            imported += len(pending_batch)
+            pending_batch.clear()
+    finally:
+        executor.shutdown()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "processed": done,
+        "imported": imported,
+        "failed": failed,
+        "elapsed": elapsed,
+        "files_per_sec": done / elapsed if elapsed else 0.0,
+    }
+
+
+# -----------------------------------------
+# Command Line
+# -----------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-import resumes from a ZIP file or directory.")
+    parser.add_argument("source", help="ZIP archive or directory of PDF/DOCX resumes")
+    parser.add_argument("--job", required=True, help="Job position to file the resumes under")
+    parser.add_argument("--recruiter", required=True, help="Email of the recruiter account that owns the import")
+    parser.add_argument("--workers", type=int, default=None, help="Scoring processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=100, help="Rows per database commit")
+    args = parser.parse_args(argv)
+
+    from app import app, init_database
+    from model import User
+
+    def report(done, imported, failed, rate):
+        print(f"\r{done} files | {imported} imported | {failed} failed | {rate:.1f} files/s", end="", flush=True)
+
+    with app.app_context():
+        init_database()
+        recruiter = User.query.filter_by(email=args.recruiter, user_type="recruiter").first()
+        if recruiter is None:
+            print(f"❌ No recruiter account for {args.recruiter}")
+            return 1
+
+        if os.path.isdir(args.source):
+            summary = ingest(iter_directory(args.source), recruiter.id, args.job,
+                             app.config["UPLOAD_FOLDER"], args.workers, args.batch_size, report)
+        else:
+            with open(args.source, "rb") as f:
+                summary = ingest(iter_zip_entries(f), recruiter.id, args.job,
+                                 app.config["UPLOAD_FOLDER"], args.workers, args.batch_size, report)
+
+    print()
+    for name, error in summary["failed"]:
+        print(f"⚠️ {name}: {error}")
+    print(f"✅ Imported {summary['imported']} of {summary['processed']} files "
+          f"in {summary['elapsed']:.1f}s ({summary['files_per_sec']:.1f} files/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
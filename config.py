@@ -19,4 +19,52 @@ class Config:
     GOOGLE_CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID')
     GOOGLE_CLIENT_SECRET = os.environ.get('GOOGLE_CLIENT_SECRET')
     UPLOAD_FOLDER = 'uploads'
-    ALLOWED_EXTENSIONS = {'pdf', 'docx'}
\ No newline at end of file
+    ALLOWED_EXTENSIONS = {'pdf', 'docx'}
+
+    # Interview processing: transcription/scoring backend and worker pool size
+    INTERVIEW_BACKEND = os.environ.get('INTERVIEW_BACKEND', 'mock')
+    INTERVIEW_WORKERS = int(os.environ.get('INTERVIEW_WORKERS') or 4)
+    INTERVIEW_MAX_SEGMENTS = int(os.environ.get('INTERVIEW_MAX_SEGMENTS') or 20)
+    # Segments still "Processing" after this many seconds are requeued
+    INTERVIEW_SEGMENT_TIMEOUT = int(os.environ.get('INTERVIEW_SEGMENT_TIMEOUT') or 600)
+
+    # Flask-Login user cache (per process)
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE') or 1024)
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL') or 60)
+
+    # Job-description ranking index (defaults to <instance>/resume_index)
+    RANK_INDEX_DIR = os.environ.get('RANK_INDEX_DIR')
+
+    # Logging: JSON lines written by a background thread, size-based rotation
+    LOG_DIR = os.environ.get('LOG_DIR', 'logs')
+    LOG_MAX_BYTES = int(os.environ.get('LOG_MAX_BYTES') or 10 * 1024 * 1024)
+    LOG_BACKUP_COUNT = int(os.environ.get('LOG_BACKUP_COUNT') or 10)
+    LOG_COMPRESS = os.environ.get('LOG_COMPRESS', 'false').lower() in ['true', 'on', '1']
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE') or 10000)
+
+    # Dashboard render cache: in-process by default, Redis if a URL is given
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES') or 512)
+    # Seconds a locally cached page may miss writes made by other processes (0 = never expire)
+    CACHE_LOCAL_TTL = int(os.environ.get('CACHE_LOCAL_TTL') or 10)
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+
+    # Scoring processes for bulk resume imports (default: CPU count)
+    BULK_INGEST_WORKERS = int(os.environ.get('BULK_INGEST_WORKERS') or 0) or None
+
+    # Storage GC / compaction (maintenance.py); interval 0 disables the scheduler
+    MAINTENANCE_INTERVAL = int(os.environ.get('MAINTENANCE_INTERVAL') or 24 * 3600)
+    MAINTENANCE_BATCH_SIZE = int(os.environ.get('MAINTENANCE_BATCH_SIZE') or 500)
+    MAINTENANCE_BATCH_PAUSE = float(os.environ.get('MAINTENANCE_BATCH_PAUSE') or 0.5)
+    MAINTENANCE_MIN_FILE_AGE = int(os.environ.get('MAINTENANCE_MIN_FILE_AGE') or 3600)
+    MAINTENANCE_VACUUM_THRESHOLD = float(os.environ.get('MAINTENANCE_VACUUM_THRESHOLD') or 0.1)
+
+    # Admission control for expensive endpoints (admission.py). Per endpoint:
+    # concurrent requests, queued requests, per-user in-flight cap, queue timeout (s)
+    ADMISSION_ENABLED = os.environ.get('ADMISSION_ENABLED', 'true').lower() in ['true', 'on', '1']
+    ADMISSION_LIMITS = {
+        'upload': {'concurrency': int(os.environ.get('ADMISSION_UPLOAD_CONCURRENCY') or 2),
+                   'queue': 8, 'per_user': 2, 'timeout': 5.0},
+        'shortlist': {'concurrency': 2, 'queue': 4, 'per_user': 1, 'timeout': 5.0},
+        'bulk_upload': {'concurrency': 1, 'queue': 0, 'per_user': 1, 'timeout': 0},
+        'export': {'concurrency': 4, 'queue': 4, 'per_user': 2, 'timeout': 5.0},
+    }
\ No newline at end of file
@@ -22,7 +22,53 @@ if USE_ML_MODEL:
 else:
     print("ℹ️ Running in Rule-Based Scoring Mode (Skills/Exp/Qualifications only).")
 
-def ai_shortlist_candidates(resume_text):
+# --- MATCH BITMASK LAYOUT ---
+# Every skill / experience marker / qualification that the resume analysis can
+# detect owns one bit of Application.skill_mask, so recruiters can filter on
+# combinations like "Python + Docker + Masters" with a bitwise SQL predicate.
+# Only ever APPEND to these lists: bit positions are persisted in the database,
+# and the column is a signed 64-bit integer, so at most 63 entries fit.
+TECH_SKILLS = [
+    'python', 'java', 'javascript', 'c++', 'c#', '.net', 'php', 
+    'react', 'angular', 'vue', 'nodejs', 'jquery', 'html', 'css', 'sass',
+    'django', 'flask', 'spring', 'express', 'rails',
+    'sql', 'nosql', 'mongodb', 'postgresql', 'mysql', 'oracle', 'sqlite',
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'git', 'linux',
+    'machine learning', 'deep learning', 'nlp', 'data science', 'ai', 'neural networks',
+    'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy',
+    'excel', 'power bi', 'tableau', 'jira', 'figma', 'photoshop'
+]
+EXPERIENCE_MARKERS = ['years of experience', 'senior', 'junior', 'intern']
+QUALIFICATION_MARKERS = ['bachelor', 'master', 'phd', 'certified', 'mba']
+
+MATCH_BITS = {
+    name: 1 << position
+    for position, name in enumerate(TECH_SKILLS + EXPERIENCE_MARKERS + QUALIFICATION_MARKERS)
+}
+
+
+def skill_mask_for(names):
+    """
+    Builds a bitmask from skill/marker names (case-insensitive).
+    Raises ValueError for names the analysis does not track.
+    """
+    mask = 0
+    for name in names:
+        key = name.strip().lower()
+        if not key:
+            continue
+        if key not in MATCH_BITS:
+            raise ValueError(f"Unknown skill or qualification: {name}")
+        mask |= MATCH_BITS[key]
+    return mask
+
+
+def skills_from_mask(mask):
+    """Inverse of skill_mask_for: the names whose bits are set."""
+    return [name for name, bit in MATCH_BITS.items() if mask & bit]
+
+
+def analyze_resume(resume_text):
     """
     FEATURE: Strict Resume Analysis
     
@@ -32,33 +78,34 @@ def ai_shortlist_candidates(resume_text):
     3. Qualifications (e.g., Degree, Certified, Masters)
     
     Returns:
-        tuple: (decision, confidence_score_0_to_100)
+        dict: decision, total_score, skill_score, experience_score,
+              qualification_score and skill_mask (see MATCH_BITS)
     """
     
+    result = {
+        "decision": "Rejected",
+        "total_score": 0.0,
+        "skill_score": 0.0,
+        "experience_score": 0.0,
+        "qualification_score": 0.0,
+        "skill_mask": 0,
+    }
+
     if not resume_text or resume_text.strip() == "":
-        return "Rejected", 0.0
+        return result
 
     # Normalize text: remove extra spaces, convert to lowercase
     text_clean = " ".join(resume_text.split()).lower()
+    mask = 0
 
     # --- 1. SKILLS SCORING (Max 40 Points) ---
     # A curated list of valid technical keywords to avoid matching generic words
-    tech_skills = [
-        'python', 'java', 'javascript', 'c++', 'c#', '.net', 'php', 
-        'react', 'angular', 'vue', 'nodejs', 'jquery', 'html', 'css', 'sass',
-        'django', 'flask', 'spring', 'express', 'rails',
-        'sql', 'nosql', 'mongodb', 'postgresql', 'mysql', 'oracle', 'sqlite',
-        'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'git', 'linux',
-        'machine learning', 'deep learning', 'nlp', 'data science', 'ai', 'neural networks',
-        'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy',
-        'excel', 'power bi', 'tableau', 'jira', 'figma', 'photoshop'
-    ]
-    
     skill_score = 0
-    for skill in tech_skills:
+    for skill in TECH_SKILLS:
         # Check if the exact skill phrase exists in the text
         if skill in text_clean:
             skill_score += 4 # 4 points per skill (Need 10 to reach cap)
+            mask |= MATCH_BITS[skill]
     
     skill_score = min(skill_score, 40) # Cap at 40
 
@@ -68,14 +115,18 @@ def ai_shortlist_candidates(resume_text):
     # Look for explicit timeframes (e.g. "2 years", "5 years")
     if re.search(r'\d+\s*years?\s*(of\s+)?experience', text_clean):
         exp_score += 20
+        mask |= MATCH_BITS['years of experience']
     
     # Look for seniority keywords
     if 'senior' in text_clean or 'lead' in text_clean:
         exp_score += 10
+        mask |= MATCH_BITS['senior']
     if 'junior' in text_clean or 'entry level' in text_clean:
         exp_score += 5
+        mask |= MATCH_BITS['junior']
     if 'intern' in text_clean or 'internship' in text_clean:
         exp_score += 5
+        mask |= MATCH_BITS['intern']
         
     exp_score = min(exp_score, 30) # Cap at 30
 
@@ -84,23 +135,45 @@ def ai_shortlist_candidates(resume_text):
     
     if 'bachelor' in text_clean or 'bsc' in text_clean or 'b.tech' in text_clean:
         qual_score += 15
+        mask |= MATCH_BITS['bachelor']
     if 'master' in text_clean or 'msc' in text_clean or 'm.tech' in text_clean:
         qual_score += 20
+        mask |= MATCH_BITS['master']
     if 'phd' in text_clean or 'doctorate' in text_clean:
         qual_score += 30
+        mask |= MATCH_BITS['phd']
     if 'certified' in text_clean or 'certification' in text_clean:
         qual_score += 10
+        mask |= MATCH_BITS['certified']
     if 'mba' in text_clean:
         qual_score += 20
+        mask |= MATCH_BITS['mba']
         
     qual_score = min(qual_score, 30) # Cap at 30
 
     # --- FINAL CALCULATION ---
     total_score = min(skill_score + exp_score + qual_score, 100)
     
-    decision = "Shortlisted" if total_score >= 60 else "Rejected"
+    result.update(
+        decision="Shortlisted" if total_score >= 60 else "Rejected",
+        total_score=float(total_score),
+        skill_score=float(skill_score),
+        experience_score=float(exp_score),
+        qualification_score=float(qual_score),
+        skill_mask=mask,
+    )
+    return result
 
-    return decision, float(total_score)
+
+def ai_shortlist_candidates(resume_text):
+    """
+    Scores a resume (see analyze_resume).
+    
+    Returns:
+        tuple: (decision, confidence_score_0_to_100)
+    """
+    result = analyze_resume(resume_text)
+    return result["decision"], result["total_score"]
 
 
 # -----------------------------------------
@@ -140,31 +213,40 @@ def calculate_ai_score(row, required_skills):
 # -----------------------------------------
 # MAIN FUNCTION – CSV Shortlisting
 # -----------------------------------------
-def ai_shortlist_csv(csv_path, job_role):
+ROLE_SKILLS = {
+    "data scientist": ["python", "ml", "machine learning", "pandas", "sql"],
+    "ml engineer": ["python", "tensorflow", "pytorch", "deep learning"],
+    "backend developer": ["python", "flask", "django", "api", "sql"],
+    "frontend developer": ["javascript", "react", "html", "css"],
+}
+
+SHORTLIST_THRESHOLD = 60
+
+
+def iter_shortlist_csv(csv_path, job_role, chunksize=10000):
     """
-    Reads CSV and returns shortlisted candidates as DataFrame
+    Reads the CSV in chunks and yields the shortlisted rows of each chunk
+    (in file order), so memory stays flat however large the file is.
     """
+    skills = ROLE_SKILLS.get(job_role.lower(), ["python", "sql"])
 
-    df = pd.read_csv(csv_path)
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        # ---- APPLY AI SCORE ----
+        chunk["ai_score"] = chunk.apply(
+            lambda row: calculate_ai_score(row, skills),
+            axis=1
+        )
 
-    # ---- REQUIRED SKILLS PER ROLE ----
-    role_skills = {
-        "data scientist": ["python", "ml", "machine learning", "pandas", "sql"],
-        "ml engineer": ["python", "tensorflow", "pytorch", "deep learning"],
-        "backend developer": ["python", "flask", "django", "api", "sql"],
-        "frontend developer": ["javascript", "react", "html", "css"],
-    }
+        # ---- SHORTLIST ----
+        yield chunk[chunk["ai_score"] >= SHORTLIST_THRESHOLD]
 
-    skills = role_skills.get(job_role.lower(), ["python", "sql"])
 
-    # ---- APPLY AI SCORE ----
-    df["ai_score"] = df.apply(
-        lambda row: calculate_ai_score(row, skills),
-        axis=1
-    )
+def ai_shortlist_csv(csv_path, job_role):
+    """
+    Reads CSV and returns shortlisted candidates as DataFrame
+    """
 
-    # ---- SHORTLIST ----
-    shortlisted = df[df["ai_score"] >= 60]
+    shortlisted = pd.concat(iter_shortlist_csv(csv_path, job_role))
 
     # ---- SORT BEST FIRST ----
     shortlisted = shortlisted.sort_values(by="ai_score", ascending=False)
@@ -0,0 +1,159 @@
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+# -----------------------------------------
+# MinHash Signatures (Near-Duplicate Resumes)
+# -----------------------------------------
+# A resume is reduced to a set of word 5-gram shingles. Its MinHash signature
+# (NUM_PERM 32-bit minimums) estimates Jaccard similarity between two resumes
+# as the fraction of equal positions. Signatures are stored per Application.
+#
+# LSH splits the signature into LSH_BANDS bands of LSH_ROWS rows; resumes that
+# share any band bucket become candidates. With 16 x 8 the candidate
+# threshold is ~(1/16)^(1/8) ≈ 0.71, just below DUPLICATE_THRESHOLD.
+
+NUM_PERM = 128
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+SHINGLE_SIZE = 5
+
+DUPLICATE_THRESHOLD = 0.8  # estimated Jaccard to flag as duplicate
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text: str) -> set:
+    """Word n-gram shingles of normalized text."""
+    words = re.findall(r"[a-z0-9+#]+", (text or "").lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(text: str):
+    """
+    Returns the MinHash signature of `text` as bytes (NUM_PERM x uint32),
+    or None if the text has no usable content.
+    """
+    shingle_set = shingles(text)
+    if not shingle_set:
+        return None
+
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle_set),
+                         dtype=np.uint64, count=len(shingle_set))
+    # (a*x + b) mod p, one row per permutation; uint64 wraparound is intended
+    with np.errstate(over="ignore"):
+        permuted = ((np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _MERSENNE_PRIME) & _MAX_HASH
+    return permuted.min(axis=1).astype("<u4").tobytes()
+
+
+def _as_array(signature: bytes) -> np.ndarray:
+    return np.frombuffer(signature, dtype="<u4")
+
+
+def estimate_similarity(sig_a: bytes, sig_b: bytes) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(_as_array(sig_a) == _as_array(sig_b)))
+
+
+def band_buckets(signature: bytes):
+    """Yields (band, bucket) pairs; bucket is a signed 64-bit hash of the band."""
+    for band in range(LSH_BANDS):
+        chunk = signature[band * LSH_ROWS * 4:(band + 1) * LSH_ROWS * 4]
+        digest = hashlib.blake2b(chunk, digest_size=8).digest()
+        yield band, int.from_bytes(digest, "little", signed=True)
+
+
+# -----------------------------------------
+# LSH Index (ResumeBand table)
+# -----------------------------------------
+def index_signature(application_id: int, signature: bytes) -> None:
+    """Adds an application's band buckets to the session (caller commits)."""
+    from model import db, ResumeBand
+
+    if signature is None:
+        return
+    db.session.add_all(
+        ResumeBand(application_id=application_id, band=band, bucket=bucket)
+        for band, bucket in band_buckets(signature)
+    )
+
+
+def index_signatures(signatures) -> None:
+    """
+    Bulk form of index_signature() for (application_id, signature) pairs: all
+    band buckets go in with one executemany INSERT (caller commits).
+    """
+    from model import db, ResumeBand
+
+    rows = [
+        {"application_id": application_id, "band": band, "bucket": bucket}
+        for application_id, signature in signatures if signature is not None
+        for band, bucket in band_buckets(signature)
+    ]
+    if rows:
+        db.session.execute(db.insert(ResumeBand), rows)
+
+
+def release_duplicates(application_id: int):
+    """
+    Call before deleting an application (caller commits). Duplicates always
+    point at the original, so the oldest of its duplicates becomes the new
+    original and the rest are re-pointed to it. Returns that id, or None.
+    """
+    from model import db, Application
+
+    successor = db.session.scalar(
+        db.select(Application.id)
+        .where(Application.duplicate_of_id == application_id)
+        .order_by(Application.id)
+        .limit(1)
+    )
+    if successor is None:
+        return None
+    db.session.execute(
+        db.update(Application)
+        .where(Application.duplicate_of_id == application_id, Application.id != successor)
+        .values(duplicate_of_id=successor)
+    )
+    db.session.execute(
+        db.update(Application).where(Application.id == successor).values(duplicate_of_id=None)
+    )
+    return successor
+
+
+def find_duplicates(signature: bytes, exclude_id: int = None, threshold: float = DUPLICATE_THRESHOLD):
+    """
+    Returns [(Application, similarity), ...] best first, for stored resumes whose
+    estimated similarity is >= threshold. Only LSH candidates are compared, found
+    through the (band, bucket) index, so cost does not grow with the table.
+    """
+    from model import db, Application, ResumeBand
+
+    if signature is None:
+        return []
+
+    bucket_match = db.or_(*[
+        db.and_(ResumeBand.band == band, ResumeBand.bucket == bucket)
+        for band, bucket in band_buckets(signature)
+    ])
+    candidate_ids = db.session.query(ResumeBand.application_id).filter(bucket_match).distinct()
+    query = Application.query.filter(Application.id.in_(candidate_ids), Application.minhash.isnot(None))
+    if exclude_id is not None:
+        query = query.filter(Application.id != exclude_id)
+
+    matches = []
+    for candidate in query.all():
+        similarity = estimate_similarity(signature, candidate.minhash)
+        if similarity >= threshold:
+            matches.append((candidate, similarity))
+    matches.sort(key=lambda m: m[1], reverse=True)
+    return matches
@@ -0,0 +1,149 @@
+import csv
+import io
+import os
+import tempfile
+
+from model import db, User, Application, Interview
+
+# -----------------------------------------
+# Streaming Exports (CSV / XLSX)
+# -----------------------------------------
+# Rows are read with yield_per (a server-side cursor where the driver supports
+# it) as plain column tuples, so no ORM objects pile up in the session, and
+# written out a block at a time. CSV responses start with the header row
+# immediately; memory stays flat regardless of the number of rows.
+#
+# XLSX is a ZIP container that can only be finalised once every row is known,
+# so it is built with openpyxl's write-only workbook (rows go straight to a
+# temp file) and streamed when complete. openpyxl is optional.
+
+FETCH_SIZE = 1000     # rows per database round trip
+ROWS_PER_CHUNK = 500  # CSV rows per response chunk
+
+APPLICATION_COLUMNS = [
+    ("Application ID", Application.id),
+    ("Candidate Email", User.email),
+    ("Job Position", Application.job_position),
+    ("Status", Application.status),
+    ("Resume Score", Application.resume_score),
+    ("Skill Score", Application.skill_score),
+    ("Experience Score", Application.experience_score),
+    ("Qualification Score", Application.qualification_score),
+    ("Interview Score", Interview.interview_score),
+    ("Duplicate Of", Application.duplicate_of_id),
+    ("Resume File", Application.resume_file),
+    ("Submitted", Application.created_at),
+]
+
+
+def application_rows(job=None, status=None, min_score=None, max_score=None, skill_mask=0):
+    """Yields filtered application rows (tuples in APPLICATION_COLUMNS order)."""
+    stmt = (
+        db.select(*[column for _, column in APPLICATION_COLUMNS])
+        .join(User, Application.user_id == User.id)
+        .outerjoin(Interview, Interview.application_id == Application.id)
+        .order_by(Application.id)
+        .execution_options(yield_per=FETCH_SIZE)
+    )
+    if job:
+        stmt = stmt.where(Application.job_position == job)
+    if status:
+        stmt = stmt.where(Application.status == status)
+    if min_score is not None:
+        stmt = stmt.where(Application.resume_score >= min_score)
+    if max_score is not None:
+        stmt = stmt.where(Application.resume_score <= max_score)
+    if skill_mask:
+        stmt = stmt.where(Application.skill_mask.op('&')(skill_mask) == skill_mask)
+
+    result = db.session.execute(stmt)
+    try:
+        for row in result:
+            yield tuple(row)
+    finally:
+        result.close()
+
+
+def shortlist_header(csv_path):
+    """Column names of the CSV shortlist export (the source columns + ai_score)."""
+    import pandas as pd
+    return tuple(pd.read_csv(csv_path, nrows=0).columns) + ("ai_score",)
+
+
+def shortlist_rows(csv_path, job_role, min_score=None, max_score=None):
+    """
+    Yields shortlisted CSV rows chunk by chunk. Rows come in file order; the
+    on-screen list is sorted best-first, which needs the whole file in memory.
+    """
+    from data_loader import iter_shortlist_csv
+
+    for chunk in iter_shortlist_csv(csv_path, job_role):
+        if min_score is not None:
+            chunk = chunk[chunk["ai_score"] >= min_score]
+        if max_score is not None:
+            chunk = chunk[chunk["ai_score"] <= max_score]
+        yield from chunk.itertuples(index=False, name=None)
+
+
+# -----------------------------------------
+# Writers
+# -----------------------------------------
+# Spreadsheet apps run text cells starting with these as formulas, and the
+# values come from uploaded resumes and CSVs (formula injection). A leading
+# apostrophe makes Excel/LibreOffice show the text as-is.
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _safe_row(row):
+    return [f"'{value}" if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES) else value
+            for value in row]
+
+
+def stream_csv(header, rows):
+    """Yields CSV text: the header at once, then blocks of ROWS_PER_CHUNK rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(_safe_row(header))
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    for count, row in enumerate(rows, 1):
+        writer.writerow(_safe_row(row))
+        if count % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def xlsx_available() -> bool:
+    try:
+        import openpyxl  # noqa: F401  (optional dependency)
+        return True
+    except ImportError:
+        return False
+
+
+def stream_xlsx(header, rows, title="Export", chunk_size=64 * 1024):
+    """Writes rows to a write-only workbook on disk, then yields the file."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title)
+    sheet.append(_safe_row(header))
+    for row in rows:
+        sheet.append(_safe_row(row))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "export.xlsx")
+        workbook.save(path)
+        with open(path, "rb") as f:
+            while True:
+                data = f.read(chunk_size)
+                if not data:
+                    break
+                yield data
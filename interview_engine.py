@@ -0,0 +1,153 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from utils import transcribe_video, score_interview
+
+# -----------------------------------------
+# Transcription & Scoring Backends
+# -----------------------------------------
+class MockInterviewBackend:
+    """Local backend built on the keyword-based mock helpers in utils."""
+
+    def transcribe(self, path: str) -> str:
+        return transcribe_video(path)
+
+    def score(self, text: str) -> float:
+        return float(score_interview(text))
+
+
+_BACKENDS = {
+    "mock": MockInterviewBackend,
+}
+
+
+def register_backend(name: str, backend_cls) -> None:
+    """
+    Registers a transcription/scoring backend.
+    A backend is any class exposing transcribe(path) -> str and score(text) -> float.
+    Select it with the INTERVIEW_BACKEND config value.
+    """
+    _BACKENDS[name] = backend_cls
+
+
+def get_backend(name: str = None):
+    """Returns an instance of the configured backend (defaults to 'mock')."""
+    if name is None:
+        from app import app  # imported INSIDE function (avoids circular import)
+        name = app.config.get("INTERVIEW_BACKEND", "mock")
+
+    try:
+        return _BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown interview backend: {name}")
+
+
+# -----------------------------------------
+# Worker Pool
+# -----------------------------------------
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                from app import app
+                _executor = ThreadPoolExecutor(
+                    max_workers=app.config.get("INTERVIEW_WORKERS", 4),
+                    thread_name_prefix="interview-worker"
+                )
+    return _executor
+
+
+def submit_segment(segment_id: int):
+    """Queues one uploaded segment for transcription and scoring."""
+    return _get_executor().submit(process_segment, segment_id)
+
+
+def process_segment(segment_id: int) -> None:
+    """
+    Transcribes and scores a single interview segment, then folds its score
+    into the parent Interview as a running average:
+
+        new_avg = (avg * n + score) / (n + 1)
+
+    The update is a single SQL statement, so segments finishing concurrently
+    never lose each other's contribution and no work is left for the end.
+    """
+    from app import app
+    from model import db, Interview, InterviewSegment
+    from render_cache import mark_dirty
+
+    with app.app_context():
+        # Claim the segment so it is never scored twice (e.g. after a requeue)
+        claimed = db.session.execute(
+            db.update(InterviewSegment)
+            .where(InterviewSegment.id == segment_id, InterviewSegment.status == "Pending")
+            .values(status="Processing", claimed_at=datetime.utcnow())
+        ).rowcount
+        db.session.commit()
+        if not claimed:
+            return
+
+        segment = db.session.get(InterviewSegment, segment_id)
+        path = os.path.join(app.config["UPLOAD_FOLDER"], segment.video_file)
+
+        try:
+            backend = get_backend()
+            text = backend.transcribe(path)
+            score = backend.score(text)
+        except Exception as e:
+            app.logger.error(f"Interview segment {segment_id} failed: {str(e)}")
+            segment.status = "Failed"
+            db.session.commit()
+            return
+
+        segment.transcript = text
+        segment.score = score
+        segment.status = "Scored"
+
+        db.session.execute(
+            db.update(Interview)
+            .where(Interview.id == segment.interview_id)
+            .values(
+                interview_score=(Interview.interview_score * Interview.video_count + score)
+                / (Interview.video_count + 1),
+                video_count=Interview.video_count + 1,
+                interview_text=db.func.coalesce(Interview.interview_text, "")
+                + f"[Q{segment.segment_index + 1}] {text}\n",
+            )
+        )
+        mark_dirty(db.session, "interview")
+        db.session.commit()
+
+
+def requeue_pending_segments() -> int:
+    """
+    Re-submits segments that were uploaded but never picked up (e.g. the
+    server restarted), and segments stuck in "Processing" for longer than
+    INTERVIEW_SEGMENT_TIMEOUT seconds: their worker died after claiming them.
+    Must run inside an app context.
+    """
+    from app import app
+    from model import db, InterviewSegment
+
+    stale_before = datetime.utcnow() - timedelta(seconds=app.config.get("INTERVIEW_SEGMENT_TIMEOUT", 600))
+    db.session.execute(
+        db.update(InterviewSegment)
+        .where(
+            InterviewSegment.status == "Processing",
+            db.or_(InterviewSegment.claimed_at.is_(None), InterviewSegment.claimed_at < stale_before),
+        )
+        .values(status="Pending")
+    )
+    db.session.commit()
+
+    pending = InterviewSegment.query.filter_by(status="Pending").all()
+    for segment in pending:
+        submit_segment(segment.id)
+    return len(pending)
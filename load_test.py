@@ -0,0 +1,222 @@
+"""
+Load test for admission control: measures latency of cheap pages (/login,
+/dashboard) on their own, then again while a storm of resume uploads runs.
+
+    python load_test.py --serve                      # boots the app on a temp DB
+    python load_test.py --serve --no-admission       # same, limits switched off
+    python load_test.py --base-url http://127.0.0.1:5000 --uploaders 32
+
+With admission control the storm is capped at ADMISSION_LIMITS['upload'] and
+the rest get fast 503/429 responses, so the cheap-route percentiles should
+barely move between the two phases.
+"""
+import argparse
+import http.cookiejar
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from collections import Counter
+
+import numpy as np
+
+PASSWORD = "loadtest-password"
+
+RESUME_PARAGRAPH = (
+    "Senior software engineer with 7 years of experience in python, django, flask, "
+    "sql, postgresql, docker, kubernetes, aws and machine learning. Led a team of "
+    "five, built data pipelines with pandas and spark. Master of Science in CS."
+)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Client:
+    """Tiny cookie-keeping HTTP client (keeps the script dependency-free)."""
+
+    def __init__(self, base_url, follow_redirects=True):
+        self.base_url = base_url.rstrip("/")
+        handlers = [urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())]
+        if not follow_redirects:
+            handlers.append(_NoRedirect())
+        self.opener = urllib.request.build_opener(*handlers)
+
+    def request(self, path, data=None, headers=None, timeout=60):
+        """Returns (status, headers, seconds)."""
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers or {})
+        started = time.perf_counter()
+        try:
+            with self.opener.open(req, timeout=timeout) as response:
+                response.read()
+                status, response_headers = response.status, response.headers
+        except urllib.error.HTTPError as e:
+            e.read()
+            status, response_headers = e.code, e.headers
+        return status, response_headers, time.perf_counter() - started
+
+    def post_form(self, path, fields):
+        return self.request(path, urllib.parse.urlencode(fields).encode("utf-8"))
+
+    def post_file(self, path, fields, file_field, filename, content):
+        boundary = uuid.uuid4().hex
+        body = io.BytesIO()
+        for name, value in fields.items():
+            body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; '
+                   f'filename="{filename}"\r\nContent-Type: application/octet-stream\r\n\r\n'.encode())
+        body.write(content)
+        body.write(f"\r\n--{boundary}--\r\n".encode())
+        return self.request(path, body.getvalue(),
+                            {"Content-Type": f"multipart/form-data; boundary={boundary}"})
+
+
+def sign_up(base_url, email, user_type="candidate", follow_redirects=True):
+    client = Client(base_url, follow_redirects)
+    client.post_form("/register", {"email": email, "password": PASSWORD, "confirm_password": PASSWORD,
+                                   "user_type": user_type, "terms": "on"})
+    client.post_form("/login", {"email": email, "password": PASSWORD})
+    return client
+
+
+def sample_resume(paragraphs):
+    """A DOCX big enough that parsing and scoring it takes real CPU time."""
+    import docx
+    document = docx.Document()
+    for i in range(paragraphs):
+        document.add_paragraph(f"{i}. {RESUME_PARAGRAPH}")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+# -----------------------------------------
+# Workers
+# -----------------------------------------
+def probe(client, path, stop, timings, interval):
+    while not stop.is_set():
+        status, _, seconds = client.request(path)
+        timings.append((status, seconds))
+        time.sleep(interval)
+
+
+def upload_storm(client, resume, stop, results):
+    while not stop.is_set():
+        status, headers, seconds = client.post_file(
+            "/upload", {"job_position": "Software Engineer"},
+            "resume", f"load_{uuid.uuid4().hex[:8]}.docx", resume)
+        results.append((status, seconds, headers.get("Retry-After")))
+        if status in (429, 503):
+            time.sleep(float(headers.get("Retry-After") or 1) * 0.1)
+
+
+def run_phase(name, probes, uploaders, resume, duration, interval):
+    stop = threading.Event()
+    timings = {path: [] for path in probes}
+    uploads = []
+
+    threads = [threading.Thread(target=probe, args=(client, path, stop, timings[path], interval))
+               for path, client in probes.items()]
+    threads += [threading.Thread(target=upload_storm, args=(client, resume, stop, uploads))
+                for client in uploaders]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    print(f"\n== {name} ==")
+    for path, samples in timings.items():
+        ms = np.array([s for _, s in samples]) * 1000
+        errors = sum(1 for status, _ in samples if status >= 500)
+        print(f"  GET {path:<12} n={len(ms):>5}  p50 {np.percentile(ms, 50):7.1f} ms  "
+              f"p95 {np.percentile(ms, 95):7.1f} ms  p99 {np.percentile(ms, 99):7.1f} ms  "
+              f"max {ms.max():7.1f} ms  5xx={errors}")
+    if uploads:
+        statuses = Counter(status for status, _, _ in uploads)
+        accepted = np.array([s for status, s, _ in uploads if status < 400]) * 1000
+        rejected = np.array([s for status, s, _ in uploads if status in (429, 503)]) * 1000
+        print(f"  POST /upload     {dict(statuses)}")
+        if len(accepted):
+            print(f"    accepted  p50 {np.percentile(accepted, 50):7.1f} ms  p95 {np.percentile(accepted, 95):7.1f} ms")
+        if len(rejected):
+            print(f"    rejected  p50 {np.percentile(rejected, 50):7.1f} ms  p95 {np.percentile(rejected, 95):7.1f} ms")
+
+
+# -----------------------------------------
+# Self-hosted target
+# -----------------------------------------
+def serve(admission_enabled):
+    """Starts the app on a free local port with a throwaway database."""
+    workdir = tempfile.mkdtemp(prefix="load_test_")
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(workdir, 'load.db')}"
+    os.environ["RANK_INDEX_DIR"] = os.path.join(workdir, "resume_index")
+    os.environ["LOG_DIR"] = os.path.join(workdir, "logs")
+    os.environ["MAINTENANCE_INTERVAL"] = "0"
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(workdir)  # uploads/ is relative to the working directory
+
+    from werkzeug.serving import make_server
+    from app import app
+
+    app.config["ADMISSION_ENABLED"] = admission_enabled
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)  # no per-request access log
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=None, help="Running server to test")
+    parser.add_argument("--serve", action="store_true", help="Start the app in-process on a temp database")
+    parser.add_argument("--no-admission", action="store_true", help="With --serve: disable admission control")
+    parser.add_argument("--uploaders", type=int, default=24, help="Concurrent upload clients in the storm")
+    parser.add_argument("--duration", type=float, default=15, help="Seconds per phase")
+    parser.add_argument("--interval", type=float, default=0.05, help="Pause between probe requests")
+    parser.add_argument("--resume-paragraphs", type=int, default=400, help="Size of the generated resume")
+    args = parser.parse_args()
+
+    if args.serve:
+        base_url = serve(not args.no_admission)
+    elif args.base_url:
+        base_url = args.base_url
+    else:
+        parser.error("give --base-url or --serve")
+
+    run_id = uuid.uuid4().hex[:6]
+    print(f"Target {base_url} | {args.uploaders} uploaders | {args.duration:.0f}s per phase")
+
+    probes = {
+        "/login": Client(base_url),
+        "/dashboard": sign_up(base_url, f"probe_{run_id}@example.com"),
+    }
+    uploaders = [sign_up(base_url, f"upload_{run_id}_{i}@example.com", follow_redirects=False)
+                 for i in range(args.uploaders)]
+    resume = sample_resume(args.resume_paragraphs)
+
+    run_phase("baseline (cheap routes only)", probes, [], resume, args.duration, args.interval)
+    run_phase("upload storm", probes, uploaders, resume, args.duration, args.interval)
+
+    recruiter = sign_up(base_url, f"recruiter_{run_id}@example.com", user_type="recruiter")
+    with recruiter.opener.open(base_url + "/metrics") as response:
+        snapshot = json.load(response)
+    print("\n== admission metrics ==")
+    for name, value in sorted(snapshot.items()):
+        if name.startswith("admission."):
+            print(f"  {name} = {value}")
+
+
+if __name__ == "__main__":
+    main()
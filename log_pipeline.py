@@ -0,0 +1,154 @@
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from flask import g, has_request_context, request
+from flask.logging import default_handler
+
+import metrics
+
+# -----------------------------------------
+# Non-Blocking Structured Logging
+# -----------------------------------------
+# Request threads only put records on a bounded queue. A QueueListener thread
+# formats them as JSON lines and writes/rotates the file. When the queue is
+# full the record is dropped and counted instead of blocking the request.
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including request id and any `extra` fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "where": f"{record.pathname}:{record.lineno}",
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks: full queue -> record dropped and counted."""
+
+    def prepare(self, record):
+        # Runs on the calling thread: resolve the message and capture request
+        # context now, but leave formatting to the listener thread.
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if has_request_context() and "request_id" in g:
+            record.request_id = g.request_id
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.inc("logging.dropped")
+
+
+class CompressingRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that can gzip rotated files (app.log.1.gz, ...)."""
+
+    def __init__(self, filename, compress=False, **kwargs):
+        super().__init__(filename, **kwargs)
+        if compress:
+            self.namer = lambda name: name + ".gz"
+            self.rotator = self._gzip_rotator
+
+    @staticmethod
+    def _gzip_rotator(source, dest):
+        with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
+
+
+def init_logging(app):
+    """
+    Attaches the queue-based JSON file logger to app.logger.
+    Settings: LOG_DIR, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_COMPRESS, LOG_QUEUE_SIZE.
+    """
+    log_dir = app.config.get("LOG_DIR", "logs")
+    os.makedirs(log_dir, exist_ok=True)
+
+    file_handler = CompressingRotatingFileHandler(
+        os.path.join(log_dir, "ai_recruiting.log"),
+        compress=app.config.get("LOG_COMPRESS", False),
+        maxBytes=app.config.get("LOG_MAX_BYTES", 10 * 1024 * 1024),
+        backupCount=app.config.get("LOG_BACKUP_COUNT", 10),
+        encoding="utf-8",
+    )
+    file_handler.setFormatter(JsonFormatter())
+    file_handler.setLevel(logging.INFO)
+
+    log_queue = queue.Queue(maxsize=app.config.get("LOG_QUEUE_SIZE", 10000))
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.setLevel(logging.INFO)
+    # Flask's stderr handler writes synchronously; the queue replaces it
+    app.logger.removeHandler(default_handler)
+    app.logger.addHandler(queue_handler)
+    app.logger.setLevel(logging.INFO)
+
+    metrics.register_gauge("logging.queue_size", log_queue.qsize)
+    metrics.inc("logging.dropped", 0)
+    return listener
+
+
+# -----------------------------------------
+# Request IDs & Stage Timings
+# -----------------------------------------
+@contextmanager
+def stage(name: str):
+    """Times a block of request work; reported in the request's log line."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if has_request_context():
+            g.setdefault("stage_timings", {})[name] = round((time.perf_counter() - start) * 1000, 2)
+
+
+def init_request_logging(app):
+    """Assigns every request an id and logs one summary line when it ends."""
+
+    @app.before_request
+    def _start_request_log():
+        g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:16]
+        g.request_started = time.perf_counter()
+        g.stage_timings = {}
+
+    @app.after_request
+    def _finish_request_log(response):
+        if "request_started" not in g or request.endpoint == "static":
+            return response
+        response.headers["X-Request-ID"] = g.request_id
+        app.logger.info("request", extra={
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round((time.perf_counter() - g.request_started) * 1000, 2),
+            "stages": g.stage_timings,
+        })
+        return response
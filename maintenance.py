@@ -0,0 +1,440 @@
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+from sqlalchemy import text
+
+import metrics
+
+# -----------------------------------------
+# Storage Garbage Collection & Compaction
+# -----------------------------------------
+# Deleting rows through the ORM cascades to interviews, segments and LSH bands
+# (see model.py), but files in uploads/ and rows left behind by older versions
+# or raw SQL are only cleaned up here. Every sweep works in small batches with
+# a pause between them, so a large backlog never holds the database or the
+# disk for long. A run ends with SQLite VACUUM / ANALYZE / PRAGMA optimize and
+# a compaction of the ranking index, and reports the bytes reclaimed.
+
+# interview_<app_id>_<timestamp>.webm, written by the single-file interview
+# route, which does not record the file name anywhere
+_LEGACY_INTERVIEW_FILE = re.compile(r"^interview_(\d+)_\d{8}_\d{6}\.webm$")
+
+
+def _settings():
+    from app import app
+    return {
+        "batch_size": app.config.get("MAINTENANCE_BATCH_SIZE", 500),
+        "pause": app.config.get("MAINTENANCE_BATCH_PAUSE", 0.5),
+        "min_age": app.config.get("MAINTENANCE_MIN_FILE_AGE", 3600),
+        "vacuum_threshold": app.config.get("MAINTENANCE_VACUUM_THRESHOLD", 0.1),
+    }
+
+
+def _batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# -----------------------------------------
+# Orphaned Files
+# -----------------------------------------
+def _referenced(names):
+    """Returns the subset of upload file names still used by some row."""
+    from model import db, Application, InterviewSegment
+
+    used = set(db.session.scalars(
+        db.select(Application.resume_file).where(Application.resume_file.in_(names))
+    ))
+    used.update(db.session.scalars(
+        db.select(InterviewSegment.video_file).where(InterviewSegment.video_file.in_(names))
+    ))
+
+    legacy = {}
+    for name in names:
+        match = _LEGACY_INTERVIEW_FILE.match(name)
+        if match:
+            legacy[name] = int(match.group(1))
+    if legacy:
+        live_ids = set(db.session.scalars(
+            db.select(Application.id).where(Application.id.in_(set(legacy.values())))
+        ))
+        used.update(name for name, app_id in legacy.items() if app_id in live_ids)
+    return used
+
+
+def remove_unreferenced_uploads(names, upload_folder) -> int:
+    """
+    Deletes the given upload files unless another row still points at them
+    (resume file names are not unique). Returns bytes freed.
+    """
+    names = [n for n in set(names) if n]
+    if not names:
+        return 0
+    freed = 0
+    for name in set(names) - _referenced(names):
+        path = os.path.join(upload_folder, name)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            freed += size
+        except FileNotFoundError:
+            pass
+    return freed
+
+
+def sweep_orphan_files(upload_folder, batch_size=500, pause=0.5, min_age=3600, dry_run=False):
+    """
+    Removes files in `upload_folder` that no Application / InterviewSegment
+    references. Files younger than `min_age` seconds are skipped: uploads are
+    saved to disk before their row is committed.
+    """
+    from model import db
+
+    removed = freed = scanned = 0
+    cutoff = time.time() - min_age
+
+    def candidates():
+        with os.scandir(upload_folder) as entries:
+            for entry in entries:
+                if entry.is_file() and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    if stat.st_mtime < cutoff:
+                        yield entry.name, stat.st_size
+
+    for batch in _batches(candidates(), batch_size):
+        scanned += len(batch)
+        used = _referenced([name for name, _ in batch])
+        db.session.rollback()  # release the read snapshot between batches
+
+        for name, size in batch:
+            if name in used:
+                continue
+            if not dry_run:
+                try:
+                    os.remove(os.path.join(upload_folder, name))
+                except FileNotFoundError:
+                    continue
+            removed += 1
+            freed += size
+        time.sleep(pause)
+
+    return {"files_scanned": scanned, "files_removed": removed, "file_bytes_freed": freed}
+
+
+# -----------------------------------------
+# Orphaned Rows
+# -----------------------------------------
+def _orphan_queries():
+    from model import db, Application, Interview, InterviewSegment, ResumeBand
+
+    queries = {
+        # Order matters: deleting orphaned interviews orphans their segments
+        "interview": (Interview, db.select(Interview.id).where(
+            ~Interview.application_id.in_(db.select(Application.id)))),
+        "interview_segment": (InterviewSegment, db.select(InterviewSegment.id).where(
+            ~InterviewSegment.interview_id.in_(db.select(Interview.id)))),
+        "resume_band": (ResumeBand, db.select(ResumeBand.id).where(
+            ~ResumeBand.application_id.in_(db.select(Application.id)))),
+    }
+    return queries
+
+
+def _count_rows(query):
+    """Row count of a select; dry runs report totals, not one batch."""
+    from model import db
+
+    count = db.session.scalar(db.select(db.func.count()).select_from(query.subquery()))
+    db.session.rollback()
+    return count
+
+
+def sweep_orphan_rows(batch_size=500, pause=0.5, dry_run=False):
+    """Deletes rows whose parent Application / Interview no longer exists."""
+    from model import db
+
+    report = {}
+    for name, (model, orphan_ids) in _orphan_queries().items():
+        if dry_run:
+            report[f"orphan_{name}_rows"] = _count_rows(orphan_ids)
+            continue
+        removed = 0
+        while True:
+            ids = db.session.scalars(orphan_ids.limit(batch_size)).all()
+            if not ids:
+                db.session.rollback()
+                break
+            db.session.execute(db.delete(model).where(model.id.in_(ids)))
+            db.session.commit()
+            removed += len(ids)
+            time.sleep(pause)
+        report[f"orphan_{name}_rows"] = removed
+
+    report["dangling_duplicate_refs"] = clear_dangling_duplicates(batch_size, pause, dry_run)
+
+    if db.engine.dialect.name == "sqlite":
+        # FTS rows are normally removed by resume_search's after_delete hook
+        fts_orphans = "FROM resume_fts WHERE rowid NOT IN (SELECT id FROM application)"
+        if dry_run:
+            report["orphan_resume_fts_rows"] = db.session.scalar(text(f"SELECT count(*) {fts_orphans}"))
+            db.session.rollback()
+            return report
+        removed = 0
+        while True:
+            ids = [row[0] for row in db.session.execute(
+                text(f"SELECT rowid {fts_orphans} LIMIT :n"), {"n": batch_size}
+            )]
+            if not ids:
+                db.session.rollback()
+                break
+            for rowid in ids:
+                db.session.execute(text("DELETE FROM resume_fts WHERE rowid = :id"), {"id": rowid})
+            db.session.commit()
+            removed += len(ids)
+            time.sleep(pause)
+        report["orphan_resume_fts_rows"] = removed
+
+    return report
+
+
+def clear_dangling_duplicates(batch_size=500, pause=0.5, dry_run=False) -> int:
+    """
+    Clears duplicate_of_id where the original no longer exists (deleted
+    outside delete_application, which re-points duplicates first).
+    """
+    from model import db, Application
+    from render_cache import mark_dirty
+
+    dangling = db.select(Application.id).where(
+        Application.duplicate_of_id.isnot(None),
+        ~Application.duplicate_of_id.in_(db.select(Application.id)),
+    )
+    if dry_run:
+        return _count_rows(dangling)
+    cleared = 0
+    while True:
+        ids = db.session.scalars(dangling.limit(batch_size)).all()
+        if not ids:
+            db.session.rollback()
+            return cleared
+        db.session.execute(db.update(Application).where(Application.id.in_(ids)).values(duplicate_of_id=None))
+        mark_dirty(db.session, "application")
+        db.session.commit()
+        cleared += len(ids)
+        time.sleep(pause)
+
+
+# -----------------------------------------
+# Database & Index Compaction
+# -----------------------------------------
+def _sqlite_size(connection):
+    page_size = connection.exec_driver_sql("PRAGMA page_size").scalar()
+    page_count = connection.exec_driver_sql("PRAGMA page_count").scalar()
+    free_pages = connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+    return page_size * page_count, page_size * free_pages
+
+
+def compact_database(vacuum_threshold=0.1, dry_run=False):
+    """
+    SQLite: merges the FTS index, runs VACUUM when at least `vacuum_threshold`
+    of the file is free pages (VACUUM rewrites the whole file and blocks
+    writers while it runs), then ANALYZE and PRAGMA optimize.
+    Other databases are left to their own autovacuum.
+    """
+    from model import db
+
+    if db.engine.dialect.name != "sqlite":
+        return {"db_bytes_reclaimed": 0, "vacuumed": False}
+
+    # VACUUM cannot run inside a transaction
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        size_before, free_before = _sqlite_size(connection)
+        vacuumed = False
+        reclaimed = 0
+        if not dry_run:
+            connection.exec_driver_sql("INSERT INTO resume_fts(resume_fts) VALUES ('optimize')")
+            size, free = _sqlite_size(connection)
+            if size and free / size >= vacuum_threshold:
+                connection.exec_driver_sql("VACUUM")
+                vacuumed = True
+                # Measured around VACUUM only: ANALYZE adds statistics pages
+                reclaimed = max(0, size - _sqlite_size(connection)[0])
+            connection.exec_driver_sql("ANALYZE")
+            connection.exec_driver_sql("PRAGMA optimize")
+
+    return {
+        "db_bytes_before": size_before,
+        "db_free_bytes_before": free_before,
+        "db_bytes_reclaimed": reclaimed,
+        "vacuumed": vacuumed,
+    }
+
+
+def _directory_size(path):
+    if not path or not os.path.isdir(path):
+        return 0
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+def compact_rank_index(dry_run=False):
+    """Drops deleted applications from the ranking index files."""
+    from model import db, Application
+    from ranking_engine import get_index
+
+    resume_index = get_index()
+    size_before = _directory_size(resume_index.directory)
+    if not dry_run:
+        # Applications deleted outside delete_application (e.g. orphan sweeps)
+        live_ids = set(db.session.scalars(db.select(Application.id)))
+        db.session.rollback()
+        resume_index.remove_many(resume_index.ids() - live_ids)
+        resume_index.compact()
+    return {"index_bytes_reclaimed": size_before - _directory_size(resume_index.directory)}
+
+
+# -----------------------------------------
+# Full Run / Scheduler
+# -----------------------------------------
+# Every web worker has a scheduler and the CLI can run at any time, so runs are
+# serialised across processes with a lock directory in the instance folder
+# (mkdir is atomic everywhere), and the mtime of a marker file next to it
+# records when the last run finished.
+LOCK_STALE_AFTER = 6 * 3600   # seconds; an older lock was left by a crashed run
+SCHEDULER_POLL = 300          # seconds between checks of the last-run marker
+
+_run_lock = threading.Lock()
+
+
+def _state_path(app, name):
+    os.makedirs(app.instance_path, exist_ok=True)
+    return os.path.join(app.instance_path, name)
+
+
+def _acquire_lock_dir(path) -> bool:
+    try:
+        os.mkdir(path)
+        return True
+    except FileExistsError:
+        pass
+    try:
+        if time.time() - os.path.getmtime(path) < LOCK_STALE_AFTER:
+            return False
+        os.rmdir(path)
+        os.mkdir(path)
+        return True
+    except (FileNotFoundError, FileExistsError):
+        return False
+
+
+def _touch(path):
+    with open(path, "a"):
+        os.utime(path)
+
+
+def run_maintenance(dry_run=False) -> dict:
+    """Runs every sweep and compaction step once. Must run in an app context."""
+    from app import app
+
+    if not _run_lock.acquire(blocking=False):
+        return {"skipped": "already running"}
+    lock_dir = _state_path(app, "maintenance.lock")
+    if not _acquire_lock_dir(lock_dir):
+        _run_lock.release()
+        return {"skipped": "already running in another process"}
+    try:
+        settings = _settings()
+        started = time.perf_counter()
+        report = {}
+        report.update(sweep_orphan_rows(settings["batch_size"], settings["pause"], dry_run))
+        report.update(sweep_orphan_files(app.config["UPLOAD_FOLDER"], settings["batch_size"],
+                                         settings["pause"], settings["min_age"], dry_run))
+        report.update(compact_database(settings["vacuum_threshold"], dry_run))
+        report.update(compact_rank_index(dry_run))
+        report["bytes_reclaimed"] = (report["file_bytes_freed"] + report["db_bytes_reclaimed"]
+                                     + report["index_bytes_reclaimed"])
+        report["elapsed"] = round(time.perf_counter() - started, 2)
+        report["dry_run"] = dry_run
+    finally:
+        if not dry_run:
+            _touch(_state_path(app, "maintenance.last_run"))
+        os.rmdir(lock_dir)
+        _run_lock.release()
+
+    if not dry_run:
+        metrics.inc("maintenance.runs")
+        metrics.inc("maintenance.files_removed", report["files_removed"])
+        metrics.inc("maintenance.bytes_reclaimed", report["bytes_reclaimed"])
+    app.logger.info("maintenance", extra={"report": report})
+    return report
+
+
+def start_scheduler(app):
+    """
+    Arms periodic maintenance (MAINTENANCE_INTERVAL seconds, 0 disables it).
+    The thread starts with the first request a process serves, so CLIs and
+    migrate_db, which import the app but serve nothing, never run one. It runs
+    run_maintenance() once the last run by any process is an interval old;
+    with no previous run, the first one waits a full interval.
+    """
+    interval = app.config.get("MAINTENANCE_INTERVAL", 0)
+    if not interval:
+        return
+    started = False
+    start_lock = threading.Lock()
+
+    def loop():
+        marker = _state_path(app, "maintenance.last_run")
+        if not os.path.exists(marker):
+            _touch(marker)
+        while True:
+            time.sleep(min(interval, SCHEDULER_POLL))
+            try:
+                if time.time() - os.path.getmtime(marker) < interval:
+                    continue
+                with app.app_context():
+                    run_maintenance()
+            except Exception as e:
+                app.logger.error(f"Maintenance run failed: {str(e)}")
+
+    @app.before_request
+    def _start_maintenance_scheduler():
+        nonlocal started
+        if started:
+            return
+        with start_lock:
+            if not started:
+                threading.Thread(target=loop, name="maintenance", daemon=True).start()
+                started = True
+
+
+# -----------------------------------------
+# Command Line
+# -----------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Remove orphaned files/rows and compact the database.")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be removed without deleting")
+    args = parser.parse_args(argv)
+
+    from app import app, init_database
+
+    with app.app_context():
+        init_database()
+        report = run_maintenance(dry_run=args.dry_run)
+
+    print(json.dumps(report, indent=2))
+    print(f"✅ Reclaimed {report.get('bytes_reclaimed', 0) / 1024 / 1024:.2f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+import threading
+
+# -----------------------------------------
+# In-Process Metrics Registry
+# -----------------------------------------
+# Counters are incremented by subsystems (caches, pipelines, ...);
+# gauges are callables evaluated only when the metrics are read.
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+
+
+def inc(name: str, amount: int = 1) -> None:
+    """Increments a named counter."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def register_gauge(name: str, fn) -> None:
+    """Registers a callable whose return value is reported as `name`."""
+    _gauges[name] = fn
+
+
+def snapshot() -> dict:
+    """Returns all counters and gauges as a flat dict."""
+    with _lock:
+        data = dict(_counters)
+    for name, fn in _gauges.items():
+        try:
+            data[name] = fn()
+        except Exception as e:
+            data[name] = f"error: {e}"
+    return data
@@ -1,5 +1,6 @@
-from app import app, db
+from app import app, db, init_database
 from sqlalchemy import text, inspect
+import os
 
 def migrate_add_video_count():
     """
@@ -27,5 +28,190 @@ def migrate_add_video_count():
             
             print("✅ Migration successful! 'video_count' added.")
 
+def migrate_add_duplicate_detection():
+    """
+    Adds the 'minhash' and 'duplicate_of_id' columns to the Application table
+    and computes signatures + LSH buckets for resumes uploaded before.
+    """
+    from model import Application
+    from utils import process_resume
+    from dedupe import minhash_signature, index_signature
+
+    with app.app_context():
+        inspector = inspect(db.engine)
+        columns = [col['name'] for col in inspector.get_columns('application')]
+
+        if 'minhash' in columns:
+            print("✅ Duplicate detection columns already exist. No action needed.")
+            return
+
+        print("📝 Adding 'minhash' and 'duplicate_of_id' to Application table...")
+        db.session.execute(text("ALTER TABLE application ADD COLUMN minhash BLOB"))
+        db.session.execute(text("ALTER TABLE application ADD COLUMN duplicate_of_id INTEGER"))
+        db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_application_duplicate_of_id ON application (duplicate_of_id)"))
+        db.session.commit()
+
+        print("📝 Computing signatures for existing resumes...")
+        # Only touch the columns this step owns, so later migrations can
+        # still be pending when this one runs
+        count = 0
+        for app_id, resume_file in db.session.query(Application.id, Application.resume_file).all():
+            path = os.path.join(app.config['UPLOAD_FOLDER'], resume_file)
+            signature = minhash_signature(process_resume(path))
+            db.session.execute(
+                db.update(Application).where(Application.id == app_id).values(minhash=signature)
+            )
+            index_signature(app_id, signature)
+            count += 1
+        db.session.commit()
+
+        print(f"✅ Migration successful! {count} resumes indexed.")
+
+def migrate_add_score_breakdown():
+    """
+    Adds the skill bitmask and sub-score columns to the Application table
+    and fills them by re-analyzing resumes uploaded before.
+    """
+    from model import Application
+    from utils import process_resume
+    from data_loader import analyze_resume
+
+    with app.app_context():
+        inspector = inspect(db.engine)
+        columns = [col['name'] for col in inspector.get_columns('application')]
+
+        if 'skill_mask' in columns:
+            print("✅ Score breakdown columns already exist. No action needed.")
+            return
+
+        print("📝 Adding skill bitmask and sub-score columns to Application table...")
+        db.session.execute(text("ALTER TABLE application ADD COLUMN skill_mask BIGINT NOT NULL DEFAULT 0"))
+        db.session.execute(text("ALTER TABLE application ADD COLUMN skill_score FLOAT DEFAULT 0"))
+        db.session.execute(text("ALTER TABLE application ADD COLUMN experience_score FLOAT DEFAULT 0"))
+        db.session.execute(text("ALTER TABLE application ADD COLUMN qualification_score FLOAT DEFAULT 0"))
+        db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_application_skill_mask ON application (skill_mask)"))
+        db.session.commit()
+
+        print("📝 Re-analyzing existing resumes...")
+        count = 0
+        for app_id, resume_file in db.session.query(Application.id, Application.resume_file).all():
+            path = os.path.join(app.config['UPLOAD_FOLDER'], resume_file)
+            analysis = analyze_resume(process_resume(path))
+            db.session.execute(
+                db.update(Application).where(Application.id == app_id).values(
+                    skill_mask=analysis["skill_mask"],
+                    skill_score=analysis["skill_score"],
+                    experience_score=analysis["experience_score"],
+                    qualification_score=analysis["qualification_score"],
+                )
+            )
+            count += 1
+        db.session.commit()
+
+        print(f"✅ Migration successful! {count} applications updated.")
+
+def migrate_add_resume_search():
+    """
+    Fills the full-text search table (created at app startup) with the
+    text of resumes uploaded before search existed.
+    """
+    from model import Application
+    from utils import process_resume
+    from resume_search import init_search_tables, index_resume
+
+    with app.app_context():
+        init_search_tables()
+        table = "resume_text" if db.engine.dialect.name == "postgresql" else "resume_fts"
+        indexed = db.session.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+
+        if indexed:
+            print("✅ Resume search index already populated. No action needed.")
+            return
+
+        print("📝 Indexing existing resumes for full-text search...")
+        count = 0
+        for app_id, resume_file in db.session.query(Application.id, Application.resume_file).all():
+            path = os.path.join(app.config['UPLOAD_FOLDER'], resume_file)
+            index_resume(app_id, process_resume(path))
+            count += 1
+        db.session.commit()
+
+        print(f"✅ Migration successful! {count} resumes indexed.")
+
+def migrate_add_segment_claimed_at():
+    """
+    Adds 'claimed_at' to InterviewSegment so segments whose worker died
+    mid-processing can be told apart from ones still being scored.
+    """
+    with app.app_context():
+        inspector = inspect(db.engine)
+        if 'interview_segment' not in inspector.get_table_names():
+            print("✅ No interview_segment table yet; db.create_all() will create it.")
+            return
+
+        columns = [col['name'] for col in inspector.get_columns('interview_segment')]
+        if 'claimed_at' in columns:
+            print("✅ Column 'claimed_at' already exists. No action needed.")
+            return
+
+        print("📝 Adding 'claimed_at' column to InterviewSegment table...")
+        db.session.execute(text("ALTER TABLE interview_segment ADD COLUMN claimed_at DATETIME"))
+        db.session.commit()
+        print("✅ Migration successful! 'claimed_at' added.")
+
+def migrate_unique_interview_per_application():
+    """
+    Makes interview.application_id unique. Applications that ended up with
+    two interviews (the single-file route next to a segmented one) keep the
+    one with the most scored answers; the others and their segments are
+    deleted, and their video files are left to maintenance.py.
+    """
+    with app.app_context():
+        inspector = inspect(db.engine)
+        if 'interview' not in inspector.get_table_names():
+            print("✅ No interview table yet; db.create_all() will create it.")
+            return
+
+        unique = any(c['column_names'] == ['application_id'] for c in inspector.get_unique_constraints('interview'))
+        unique = unique or any(ix['unique'] and ix['column_names'] == ['application_id']
+                               for ix in inspector.get_indexes('interview'))
+        if unique:
+            print("✅ interview.application_id is already unique. No action needed.")
+            return
+
+        rows = db.session.execute(text(
+            "SELECT id, application_id FROM interview "
+            "ORDER BY application_id, COALESCE(video_count, 0) DESC, id DESC"
+        )).all()
+        kept, extra = set(), []
+        for interview_id, app_id in rows:
+            if app_id in kept:
+                extra.append(interview_id)
+            else:
+                kept.add(app_id)
+
+        if extra:
+            print(f"📝 Removing {len(extra)} extra interview(s)...")
+            has_segments = 'interview_segment' in inspector.get_table_names()
+            for interview_id in extra:
+                if has_segments:
+                    db.session.execute(text("DELETE FROM interview_segment WHERE interview_id = :id"), {"id": interview_id})
+                db.session.execute(text("DELETE FROM interview WHERE id = :id"), {"id": interview_id})
+
+        print("📝 Adding a unique index on interview.application_id...")
+        db.session.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_interview_application_id ON interview (application_id)"
+        ))
+        db.session.commit()
+        print("✅ Migration successful! One interview per application.")
+
 if __name__ == "__main__":
-    migrate_add_video_count()
\ No newline at end of file
+    # Create missing tables first; the steps below only alter existing ones
+    with app.app_context():
+        init_database()
+    migrate_add_video_count()
+    migrate_add_duplicate_detection()
+    migrate_add_score_breakdown()
+    migrate_add_resume_search()
+    migrate_add_segment_claimed_at()
+    migrate_unique_interview_per_application()
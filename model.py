@@ -16,7 +16,8 @@ class User(UserMixin, db.Model):
     password_reset_token = db.Column(db.String(100), unique=True)
     password_reset_expires = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    applications = db.relationship('Application', backref='user', lazy=True)
+    applications = db.relationship('Application', backref='user', lazy=True,
+                                   cascade='all, delete-orphan')
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -25,6 +26,9 @@ class User(UserMixin, db.Model):
         return check_password_hash(self.password_hash, password)
     
     # ... (Password reset methods) ...
+    def clear_password_reset_token(self):
+        self.password_reset_token = None
+        self.password_reset_expires = None
 
 class Application(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -35,15 +39,68 @@ class Application(db.Model):
     status = db.Column(db.String(20), default='Submitted')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # MinHash signature of the resume text (see dedupe.py) and, if this resume
+    # is a near-copy of an earlier one, the id of that original application
+    minhash = db.Column(db.LargeBinary)
+    duplicate_of_id = db.Column(db.Integer, index=True)
+    bands = db.relationship('ResumeBand', lazy=True, cascade='all, delete-orphan')
+
+    # Resume analysis breakdown (see data_loader.analyze_resume). skill_mask has
+    # one bit per matched skill/experience marker/qualification (MATCH_BITS).
+    skill_mask = db.Column(db.BigInteger, default=0, nullable=False, index=True)
+    skill_score = db.Column(db.Float, default=0.0)
+    experience_score = db.Column(db.Float, default=0.0)
+    qualification_score = db.Column(db.Float, default=0.0)
+
     # IMPORTANT: This link allows app.interview to work in dashboard.html
-    interview = db.relationship('Interview', backref='application', uselist=False)
+    # Deleting an application deletes its interview (and, through it, the segments)
+    interview = db.relationship('Interview', backref='application', uselist=False,
+                                cascade='all, delete-orphan')
+
+    @classmethod
+    def with_all_skills(cls, mask):
+        """Query for applications whose skill_mask contains every bit of `mask`."""
+        # The id subquery only reads the skill_mask index (covering), then rows
+        # are fetched by primary key; no resume text is involved.
+        matching_ids = db.select(cls.id).where(cls.skill_mask.op('&')(mask) == mask)
+        return cls.query.filter(cls.id.in_(matching_ids))
+
+class ResumeBand(db.Model):
+    """LSH band buckets of Application.minhash, used to find near-duplicates."""
+    __table_args__ = (db.Index('ix_resume_band_bucket', 'band', 'bucket'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    application_id = db.Column(db.Integer, db.ForeignKey('application.id'), nullable=False, index=True)
+    band = db.Column(db.Integer, nullable=False)
+    bucket = db.Column(db.BigInteger, nullable=False)
 
 class Interview(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    application_id = db.Column(db.Integer, db.ForeignKey('application.id'), nullable=False)
+    # One interview per application (Application.interview is uselist=False)
+    application_id = db.Column(db.Integer, db.ForeignKey('application.id'), nullable=False, unique=True)
     interview_text = db.Column(db.Text)
     interview_score = db.Column(db.Float, default=0.0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # NEW: Store number of questions answered to calculate average score
-    video_count = db.Column(db.Integer, default=0)
\ No newline at end of file
+    video_count = db.Column(db.Integer, default=0)
+
+    # One row per recorded question, scored independently as it arrives
+    segments = db.relationship('InterviewSegment', backref='interview', lazy=True,
+                               cascade='all, delete-orphan',
+                               order_by='InterviewSegment.segment_index')
+
+class InterviewSegment(db.Model):
+    __table_args__ = (db.UniqueConstraint('interview_id', 'segment_index'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    interview_id = db.Column(db.Integer, db.ForeignKey('interview.id'), nullable=False)
+    segment_index = db.Column(db.Integer, nullable=False)
+    video_file = db.Column(db.String(200), nullable=False)
+    transcript = db.Column(db.Text)
+    score = db.Column(db.Float)
+    # Pending -> Processing -> Scored (or Failed, which the client may re-upload)
+    status = db.Column(db.String(20), default='Pending', nullable=False)
+    # Set when a worker starts on the segment; stale claims are requeued
+    claimed_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
@@ -0,0 +1,493 @@
+import glob
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from train_model import VECTORIZER_PARAMS
+
+# -----------------------------------------
+# Job Description → Resume Ranking Engine
+# -----------------------------------------
+# Resumes are stored as rows of one sparse matrix, built once and appended to
+# as new resumes arrive. A job description is vectorized the same way and the
+# ranking is a single sparse matrix-vector product followed by argpartition.
+#
+# We use the same tokenization/stop words as train_model.py's TfidfVectorizer,
+# but hash terms instead of fitting a vocabulary so new resumes can be added
+# without refitting. IDF is derived from running document frequencies and
+# applied at query time, so it stays correct as the collection grows.
+#
+# Document frequencies count every row stored, including removed or
+# superseded ones, until a compaction drops them.
+
+N_FEATURES = 2 ** 18
+COMPACT_AFTER_SEGMENTS = 256   # segment files before a background compaction
+COMPACT_MIN_AGE = 5.0          # seconds; younger segments wait for the next compaction
+LOCK_STALE_AFTER = 3600        # seconds before an abandoned compaction lock is broken
+
+log = logging.getLogger(__name__)
+
+
+def build_vectorizer(n_features: int = N_FEATURES) -> HashingVectorizer:
+    return HashingVectorizer(
+        stop_words=VECTORIZER_PARAMS["stop_words"],
+        n_features=n_features,
+        alternate_sign=False,
+        norm=None,
+        dtype=np.float32,
+    )
+
+
+def _tf_rows(counts: sp.csr_matrix) -> sp.csr_matrix:
+    """Sublinear term frequency, L2-normalized per row."""
+    counts = counts.tocsr().astype(np.float32)
+    counts.data = 1.0 + np.log(counts.data)
+    norms = np.sqrt(counts.multiply(counts).sum(axis=1)).A1
+    norms[norms == 0] = 1.0
+    return sp.csr_matrix(sp.diags(1.0 / norms).dot(counts), dtype=np.float32)
+
+
+# -----------------------------------------
+# Segments
+# -----------------------------------------
+# A segment is a block (name, matrix, ids, removed): rows added for `ids`
+# and/or ids removed. Replaying blocks in name order gives the index: the
+# newest row per id is live unless a later block removed it.
+def _segment_name(stamp: int, generation: int = 0) -> str:
+    """seg_<ns timestamp>_<generation>_<pid>_<random>.npz; sorts by (stamp, generation)."""
+    return f"seg_{stamp:020d}_{generation:03d}_{os.getpid()}_{uuid.uuid4().hex[:8]}.npz"
+
+
+def _segment_key(name: str):
+    parts = os.path.basename(name)[4:-4].split("_")
+    return int(parts[0]), int(parts[1]) if len(parts) > 1 else 0, name
+
+
+def _block(matrix, ids=(), removed=(), name=None):
+    return (name, matrix, np.asarray(ids, dtype=np.int64), np.asarray(removed, dtype=np.int64))
+
+
+def _stack(matrices, n_features):
+    matrices = [m for m in matrices if m.shape[0]]
+    if not matrices:
+        return sp.csr_matrix((0, n_features), dtype=np.float32)
+    if len(matrices) == 1:
+        return matrices[0]
+    return sp.vstack(matrices, format="csr", dtype=np.float32)
+
+
+def _live_rows(blocks) -> np.ndarray:
+    """Bool mask over the blocks' concatenated rows: the newest row per id, unless removed later."""
+    ids, keys = [], []
+    offset = 0
+    for _, _, row_ids, removed in blocks:
+        # Rows get odd keys, a block's removals the even key just before its rows
+        ids += [row_ids, removed]
+        keys += [2 * np.arange(offset, offset + len(row_ids), dtype=np.int64) + 1,
+                 np.full(len(removed), 2 * offset, dtype=np.int64)]
+        offset += len(row_ids)
+
+    alive = np.zeros(offset, dtype=bool)
+    ids = np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64)
+    if len(ids):
+        keys = np.concatenate(keys)
+        order = np.lexsort((keys, ids))
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = ids[order[:-1]] != ids[order[1:]]
+        winners = keys[order[last]]
+        alive[winners[winners % 2 == 1] // 2] = True
+    return alive
+
+
+class ResumeIndex:
+    """
+    Sparse resume index persisted under `directory` as immutable segment files
+    (see _segment_name). Writers never modify a file, they only add new ones
+    with unique names, so any number of processes (web workers, bulk_ingest,
+    maintenance) can write to the same directory:
+
+      * add()/remove() buffer a block in memory; flush() writes it as a segment.
+      * Queries first pick up segments written by other processes.
+      * compact() merges old segments into one under a lock directory and
+        deletes them; other processes notice and reload in the background.
+
+    In memory, a consolidated base matrix is scored together with a small tail
+    of newer blocks, so an upload never re-stacks the whole collection.
+    """
+
+    def __init__(self, directory: str = None, n_features: int = N_FEATURES):
+        self.directory = directory
+        self.n_features = n_features
+        self.vectorizer = build_vectorizer(n_features)
+
+        self._pending = []           # blocks not yet flushed
+        self._last_stamp = 0
+        self._reloading = False
+        self._compacting = False
+        self._lock = threading.RLock()
+
+        blocks = self._read_all() if directory and os.path.isdir(directory) else []
+        if blocks:
+            self.n_features = blocks[0][1].shape[1]
+            self.vectorizer = build_vectorizer(self.n_features)
+        self._set_base(blocks)
+
+    # ---------- Writing ----------
+    def add(self, app_id: int, text: str) -> None:
+        self.add_many([app_id], [text])
+
+    def add_many(self, app_ids, texts) -> None:
+        self.add_vectors(app_ids, _tf_rows(self.vectorizer.transform(texts)))
+
+    def add_vectors(self, app_ids, rows: sp.csr_matrix) -> None:
+        """Appends pre-computed, row-normalized term vectors."""
+        with self._lock:
+            self._append(_block(sp.csr_matrix(rows, dtype=np.float32), [int(i) for i in app_ids]))
+
+    def remove(self, app_id: int) -> None:
+        """Tombstones a resume; its row is dropped at the next compaction."""
+        self.remove_many([app_id])
+
+    def remove_many(self, app_ids) -> None:
+        app_ids = [int(i) for i in app_ids]
+        if app_ids:
+            with self._lock:
+                self._append(_block(sp.csr_matrix((0, self.n_features), dtype=np.float32), removed=app_ids))
+
+    def _append(self, block):
+        self._pending.append(block)
+        self._count(block)
+        self._tail_view = None
+
+    def _count(self, block):
+        # Each row lists a term at most once, so this counts documents
+        matrix = block[1]
+        if matrix.shape[0]:
+            self.doc_freq += np.bincount(matrix.indices, minlength=self.n_features)
+            self.n_docs += matrix.shape[0]
+
+    # ---------- Querying ----------
+    def top_k(self, job_description: str, k: int = 20):
+        """Returns [(application_id, score), ...] best match first."""
+        with self._lock:
+            self._refresh()
+            base, base_ids = self._base_matrix, self._base_ids
+            tail, tail_ids, tail_alive, base_alive = self._view()
+
+        n_base = base.shape[0]
+        if n_base + tail.shape[0] == 0 or not job_description.strip():
+            return []
+
+        query = self.query_vector(job_description)
+        scores = np.concatenate([base.dot(query), tail.dot(query)])
+        scores[:n_base][~base_alive] = -np.inf
+        scores[n_base:][~tail_alive] = -np.inf
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(base_ids[i] if i < n_base else tail_ids[i - n_base]), float(scores[i]))
+                for i in top if scores[i] > 0]
+
+    def query_vector(self, text: str) -> np.ndarray:
+        """TF-IDF query weights (IDF applied twice so documents get it too)."""
+        counts = self.vectorizer.transform([text]).tocsr()
+        query = np.zeros(self.n_features, dtype=np.float32)
+        query[counts.indices] = 1.0 + np.log(counts.data)
+        idf = np.log((1.0 + self.n_docs) / (1.0 + self.doc_freq[counts.indices])) + 1.0
+        query[counts.indices] *= (idf * idf).astype(np.float32)
+        return query
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            _, _, tail_alive, base_alive = self._view()
+            return int(base_alive.sum() + tail_alive.sum())
+
+    def ids(self) -> set:
+        """Application ids currently searchable."""
+        with self._lock:
+            self._refresh()
+            _, tail_ids, tail_alive, base_alive = self._view()
+            return set(self._base_ids[base_alive].tolist()) | set(tail_ids[tail_alive].tolist())
+
+    def _set_base(self, blocks):
+        """Makes `blocks` the consolidated base; unflushed blocks stay on top."""
+        self._base_matrix = _stack([b[1] for b in blocks], self.n_features)
+        self._base_ids = (np.concatenate([b[2] for b in blocks]) if blocks
+                          else np.zeros(0, dtype=np.int64))
+        self._base_alive = _live_rows(blocks)
+        live = np.flatnonzero(self._base_alive)
+        order = np.argsort(self._base_ids[live], kind="stable")
+        self._base_lookup = (self._base_ids[live][order], live[order])
+
+        self._files = {b[0] for b in blocks}
+        self._dir_mtime = None
+        self._tail = []
+        self._tail_view = None
+        self.doc_freq = np.bincount(self._base_matrix.indices, minlength=self.n_features).astype(np.int64)
+        self.n_docs = self._base_matrix.shape[0]
+        for block in self._pending:
+            self._count(block)
+
+    def _view(self):
+        """(tail matrix, tail ids, tail alive, base alive), rebuilt when the tail changes."""
+        if self._tail_view is None:
+            blocks = self._tail + self._pending
+            tail = _stack([b[1] for b in blocks], self.n_features)
+            tail_ids = np.concatenate([b[2] for b in blocks]) if blocks else np.zeros(0, dtype=np.int64)
+
+            # Any id the tail adds or removes supersedes its live base row
+            base_alive = self._base_alive
+            touched = np.unique(np.concatenate([tail_ids] + [b[3] for b in blocks]))
+            sorted_ids, positions = self._base_lookup
+            at = np.searchsorted(sorted_ids, touched)
+            found = at < len(sorted_ids)
+            at = at[found][sorted_ids[at[found]] == touched[found]]
+            if len(at):
+                base_alive = base_alive.copy()
+                base_alive[positions[at]] = False
+
+            self._tail_view = (tail, tail_ids, _live_rows(blocks), base_alive)
+        return self._tail_view
+
+    # ---------- Persistence ----------
+    def flush(self) -> None:
+        """Writes each buffered block as a new segment file."""
+        if not self.directory:
+            return
+        with self._lock:
+            if not self._pending:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            for _, matrix, ids, removed in self._pending:
+                self._last_stamp = max(time.time_ns(), self._last_stamp + 1)
+                name = _segment_name(self._last_stamp)
+                self._write_segment(name, matrix, ids, removed)
+                self._tail.append((name, matrix, ids, removed))
+                self._files.add(name)
+            self._pending = []
+            self._tail.sort(key=lambda b: _segment_key(b[0]))
+            self._tail_view = None
+            crowded = len(self._files) > COMPACT_AFTER_SEGMENTS
+        if crowded:
+            self.compact_async()
+
+    def compact(self, min_age: float = COMPACT_MIN_AGE) -> bool:
+        """
+        Merges the segments older than `min_age` seconds into one and drops
+        removed/superseded rows. The merged file sorts right after the newest
+        segment it replaces, so anything other processes write meanwhile still
+        applies on top. Returns False if another compaction is running.
+        """
+        if not self.directory:
+            with self._lock:
+                tail, tail_ids, tail_alive, base_alive = self._view()
+                merged = _block(_stack([self._base_matrix[base_alive], tail[tail_alive]], self.n_features),
+                                np.concatenate([self._base_ids[base_alive], tail_ids[tail_alive]]))
+                self._pending = []
+                self._set_base([merged])
+            return True
+
+        self.flush()
+        lock_dir = os.path.join(self.directory, "compact.lock")
+        if not _acquire_lock_dir(lock_dir):
+            return False
+        try:
+            cutoff = time.time_ns() - int(min_age * 1e9)
+            names = [n for n in self._segment_names() if _segment_key(n)[0] < cutoff]
+            blocks = [self._read_segment(n) for n in names]
+            alive = _live_rows(blocks)
+            if not blocks or (len(blocks) == 1 and alive.all() and not len(blocks[0][3])):
+                return True
+
+            stamp, generation, _ = _segment_key(names[-1])
+            matrix = _stack([b[1] for b in blocks], self.n_features)[alive]
+            ids = np.concatenate([b[2] for b in blocks])[alive]
+            self._write_segment(_segment_name(stamp, generation + 1), matrix, ids, ())
+            for name in names:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+        finally:
+            os.rmdir(lock_dir)
+
+        self._reload()
+        return True
+
+    def compact_async(self):
+        """Runs compact() on a daemon thread unless one is already running here."""
+        with self._lock:
+            if self._compacting:
+                return None
+            self._compacting = True
+
+        def run():
+            try:
+                self.compact()
+            except Exception:
+                log.exception("Resume index compaction failed")
+            finally:
+                self._compacting = False
+
+        thread = threading.Thread(target=run, name="resume-index-compact", daemon=True)
+        thread.start()
+        return thread
+
+    def _refresh(self):
+        """Loads segments other processes wrote; reloads in the background after a compaction."""
+        if not self.directory or self._reloading:
+            return
+        try:
+            mtime = os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            return
+        # Coarse directory timestamps can hide a write made in the same tick
+        if mtime == self._dir_mtime and time.time_ns() - mtime > 2e9:
+            return
+
+        names = self._segment_names()
+        if not self._files <= set(names):
+            self._reload_async()
+            return
+        new = [n for n in names if n not in self._files]
+        try:
+            blocks = [self._read_segment(n) for n in new]
+        except FileNotFoundError:
+            self._reload_async()
+            return
+        for block in blocks:
+            self._tail.append(block)
+            self._files.add(block[0])
+            self._count(block)
+        if blocks:
+            self._tail.sort(key=lambda b: _segment_key(b[0]))
+            self._tail_view = None
+        self._dir_mtime = mtime
+
+    def _reload(self):
+        blocks = self._read_all()
+        with self._lock:
+            self._set_base(blocks)
+
+    def _reload_async(self):
+        self._reloading = True
+
+        def run():
+            try:
+                self._reload()
+            except Exception:
+                log.exception("Resume index reload failed")
+            finally:
+                self._reloading = False
+
+        threading.Thread(target=run, name="resume-index-reload", daemon=True).start()
+
+    def _segment_names(self):
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+        names = [os.path.basename(p) for p in glob.glob(os.path.join(self.directory, "seg_*.npz"))]
+        return sorted(names, key=_segment_key)
+
+    def _read_all(self):
+        for _ in range(5):
+            try:
+                return [self._read_segment(name) for name in self._segment_names()]
+            except FileNotFoundError:
+                continue  # compacted while we were reading; list again
+        raise RuntimeError(f"Resume index at {self.directory} keeps changing while loading")
+
+    def _read_segment(self, name):
+        with np.load(os.path.join(self.directory, name)) as seg:
+            matrix = sp.csr_matrix((seg["data"], seg["indices"], seg["indptr"]),
+                                   shape=tuple(seg["shape"]))
+            removed = seg["removed"] if "removed" in seg.files else ()
+            return _block(matrix, seg["ids"], removed, name)
+
+    def _write_segment(self, name, matrix, ids, removed):
+        # Dot-prefixed temp file: invisible to the seg_*.npz glob until renamed
+        tmp = os.path.join(self.directory, f".{name}.tmp.npz")
+        np.savez(tmp, data=matrix.data, indices=matrix.indices, indptr=matrix.indptr,
+                 shape=np.array(matrix.shape), ids=np.asarray(ids, dtype=np.int64),
+                 removed=np.asarray(removed, dtype=np.int64))
+        os.replace(tmp, os.path.join(self.directory, name))
+
+
+def _acquire_lock_dir(path) -> bool:
+    """mkdir-based lock (atomic on every platform); breaks locks older than LOCK_STALE_AFTER."""
+    for _ in range(2):
+        try:
+            os.mkdir(path)
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) < LOCK_STALE_AFTER:
+                    return False
+                os.rmdir(path)
+            except FileNotFoundError:
+                pass
+    return False
+
+
+# -----------------------------------------
+# App-wide Index
+# -----------------------------------------
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> ResumeIndex:
+    """Loads the persisted index once per process (path: RANK_INDEX_DIR)."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                from app import app  # imported INSIDE function (avoids circular import)
+                directory = app.config.get("RANK_INDEX_DIR") or os.path.join(app.instance_path, "resume_index")
+                _index = ResumeIndex(directory)
+    return _index
+
+
+def rebuild_index(batch_size: int = 500) -> int:
+    """Re-extracts every stored resume and writes a fresh index."""
+    from app import app
+    from model import Application
+    from utils import process_resume
+    import shutil
+
+    global _index
+    with app.app_context():
+        directory = app.config.get("RANK_INDEX_DIR") or os.path.join(app.instance_path, "resume_index")
+        shutil.rmtree(directory, ignore_errors=True)
+        index = ResumeIndex(directory)
+
+        ids, texts = [], []
+        for application in Application.query.yield_per(batch_size):
+            path = os.path.join(app.config["UPLOAD_FOLDER"], application.resume_file)
+            ids.append(application.id)
+            texts.append(process_resume(path))
+            if len(ids) >= batch_size:
+                index.add_many(ids, texts)
+                ids, texts = [], []
+        if ids:
+            index.add_many(ids, texts)
+        index.flush()
+        index.compact(min_age=0)
+
+        _index = index
+        return len(index)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "rebuild":
+        print(f"✅ Indexed {rebuild_index()} resumes.")
+    else:
+        print("Usage: python ranking_engine.py rebuild")
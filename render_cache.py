@@ -0,0 +1,170 @@
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from flask import make_response, request, session
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import metrics
+from model import Application, Interview, InterviewSegment
+
+# -----------------------------------------
+# Dashboard Render Cache
+# -----------------------------------------
+# Every cached page depends on one or more "tables" whose version counters are
+# bumped after any committed write to them. A page is cached under its view key
+# plus those versions, and its ETag is derived from the same values, so:
+#   * a repeat view with a matching If-None-Match is a 304 without touching
+#     the database or the template;
+#   * a changed version simply misses (old entries age out of the LRU).
+#
+# The local backend is per process: writes made by other processes (other
+# workers, the CLIs, migrate_db) never bump its counters. Its versions
+# therefore also include a time bucket of CACHE_LOCAL_TTL seconds, so such
+# writes show up after at most that long. Use a shared backend
+# (CACHE_REDIS_URL) to see them immediately.
+
+_VERSIONED_MODELS = {
+    Application: "application",
+    Interview: "interview",
+    InterviewSegment: "interview",
+}
+
+
+class LocalCacheBackend:
+    """
+    In-process LRU for rendered pages plus plain integer version counters.
+    With `ttl` > 0, versions roll over every `ttl` seconds (see module notes).
+    """
+
+    def __init__(self, max_entries=512, ttl=10):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._pages = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        # Counters restart at 0 with the process; the epoch keeps ETags
+        # issued by a previous process from matching the new counters
+        self._epoch = secrets.token_hex(4)
+
+    def get(self, key):
+        with self._lock:
+            value = self._pages.get(key)
+            if value is not None:
+                self._pages.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._pages[key] = value
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+
+    def versions(self, tables):
+        bucket = int(time.time() // self.ttl) if self.ttl else 0
+        with self._lock:
+            return (self._epoch, bucket) + tuple(self._versions.get(t, 0) for t in tables)
+
+    def bump(self, table):
+        with self._lock:
+            self._versions[table] = self._versions.get(table, 0) + 1
+
+
+class RedisCacheBackend:
+    """Shared backend; requires the optional `redis` package."""
+
+    def __init__(self, url, ttl=3600):
+        import redis  # optional dependency
+        self._redis = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def get(self, key):
+        value = self._redis.get(f"page:{key}")
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key, value):
+        self._redis.set(f"page:{key}", value, ex=self.ttl)
+
+    def versions(self, tables):
+        return tuple(int(v or 0) for v in self._redis.mget([f"version:{t}" for t in tables]))
+
+    def bump(self, table):
+        self._redis.incr(f"version:{table}")
+
+
+backend = LocalCacheBackend()
+
+
+def init_app(app):
+    """Selects the backend: Redis if CACHE_REDIS_URL is set, local otherwise."""
+    global backend
+    if app.config.get("CACHE_REDIS_URL"):
+        backend = RedisCacheBackend(app.config["CACHE_REDIS_URL"])
+    else:
+        backend = LocalCacheBackend(app.config.get("CACHE_MAX_ENTRIES", 512),
+                                    app.config.get("CACHE_LOCAL_TTL", 10))
+
+
+# -----------------------------------------
+# Version Bumps (after commit only)
+# -----------------------------------------
+def mark_dirty(db_session, *tables):
+    """Records writes the ORM cannot see (e.g. bulk UPDATE statements)."""
+    db_session.info.setdefault("dirty_tables", set()).update(tables)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_dirty_tables(db_session, flush_context):
+    for obj in list(db_session.new) + list(db_session.dirty) + list(db_session.deleted):
+        table = _VERSIONED_MODELS.get(type(obj))
+        if table:
+            mark_dirty(db_session, table)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_versions(db_session):
+    for table in db_session.info.pop("dirty_tables", ()):
+        backend.bump(table)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_dirty_tables(db_session, previous_transaction):
+    db_session.info.pop("dirty_tables", None)
+
+
+# -----------------------------------------
+# Cached Responses with ETag / 304
+# -----------------------------------------
+def cached_page(view_key, tables, render):
+    """
+    Returns a response for `render()` cached under `view_key` and the current
+    versions of `tables`. Pages with pending flash messages are rendered fresh
+    (the messages are part of the HTML and must only be shown once).
+    """
+    versions = backend.versions(tables)
+    etag = hashlib.sha1(repr((view_key, versions)).encode("utf-8")).hexdigest()
+
+    if session.get("_flashes"):
+        # Not cacheable and no ETag, so the browser never revalidates into it
+        return make_response(render())
+
+    if etag in request.if_none_match:
+        metrics.inc("render_cache.not_modified")
+        response = make_response("", 304)
+    else:
+        body = backend.get(etag)
+        if body is None:
+            metrics.inc("render_cache.misses")
+            body = render()
+            backend.set(etag, body)
+        else:
+            metrics.inc("render_cache.hits")
+        response = make_response(body)
+
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,124 @@
+import re
+
+from markupsafe import Markup, escape
+from sqlalchemy import event, text
+
+from model import db, Application
+
+# -----------------------------------------
+# Full-Text Resume Search
+# -----------------------------------------
+# SQLite:     FTS5 virtual table `resume_fts`, rowid = application id,
+#             ranked with bm25().
+# PostgreSQL: table `resume_text` with a generated tsvector + GIN index,
+#             ranked with ts_rank_cd() (PostgreSQL has no built-in BM25).
+#
+# Rows are written in the same transaction as the Application and removed by
+# the after_delete hook below, so the index never drifts from the table.
+
+_HL_START, _HL_END = "\x02", "\x03"
+
+
+def _dialect():
+    return db.engine.dialect.name
+
+
+def init_search_tables() -> None:
+    """Creates the search table for the current database (idempotent)."""
+    if _dialect() == "postgresql":
+        db.session.execute(text(
+            "CREATE TABLE IF NOT EXISTS resume_text ("
+            " application_id INTEGER PRIMARY KEY REFERENCES application(id) ON DELETE CASCADE,"
+            " body TEXT NOT NULL,"
+            " tsv tsvector GENERATED ALWAYS AS (to_tsvector('english', body)) STORED)"
+        ))
+        db.session.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_resume_text_tsv ON resume_text USING GIN (tsv)"
+        ))
+    else:
+        db.session.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS resume_fts "
+            "USING fts5(body, tokenize='porter unicode61')"
+        ))
+    db.session.commit()
+
+
+def index_resume(application_id: int, resume_text: str) -> None:
+    """Stores extracted resume text for searching (caller commits)."""
+    if _dialect() == "postgresql":
+        db.session.execute(text(
+            "INSERT INTO resume_text (application_id, body) VALUES (:id, :body) "
+            "ON CONFLICT (application_id) DO UPDATE SET body = EXCLUDED.body"
+        ), {"id": application_id, "body": resume_text or ""})
+    else:
+        db.session.execute(text("DELETE FROM resume_fts WHERE rowid = :id"), {"id": application_id})
+        db.session.execute(text(
+            "INSERT INTO resume_fts (rowid, body) VALUES (:id, :body)"
+        ), {"id": application_id, "body": resume_text or ""})
+
+
+@event.listens_for(Application, "after_delete")
+def _remove_deleted_resume(mapper, connection, target):
+    # PostgreSQL rows go away through ON DELETE CASCADE
+    if connection.dialect.name != "postgresql":
+        connection.execute(text("DELETE FROM resume_fts WHERE rowid = :id"), {"id": target.id})
+
+
+def _fts5_query(user_query: str) -> str:
+    """
+    Turns free text into a safe FTS5 expression: every word becomes a quoted
+    term (implicit AND); a trailing * keeps prefix matching ("pyth*").
+    """
+    terms = []
+    for word in re.findall(r"[\w+#.]+\*?", user_query):
+        prefix = word.endswith("*")
+        word = word.rstrip("*").strip(".")
+        if word:
+            terms.append('"' + word.replace('"', '""') + '"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def _highlight(snippet: str) -> Markup:
+    """Escapes resume text, then turns the match markers into <mark> tags."""
+    safe = str(escape(snippet or ""))
+    return Markup(safe.replace(_HL_START, "<mark>").replace(_HL_END, "</mark>"))
+
+
+def search_resumes(user_query: str, page: int = 1, per_page: int = 20):
+    """
+    Returns (results, has_next) where results is a list of
+    {"application_id", "rank", "snippet"} dicts, best match first.
+    Fetches one extra row instead of counting all matches, so deep
+    result sets cost no more than a single page.
+    """
+    page = max(page, 1)
+    params = {"limit": per_page + 1, "offset": (page - 1) * per_page}
+
+    if _dialect() == "postgresql":
+        if not user_query.strip():
+            return [], False
+        params["q"] = user_query
+        rows = db.session.execute(text(
+            "SELECT application_id, ts_rank_cd(tsv, q) AS rank,"
+            " ts_headline('english', body, q,"
+            "  'StartSel=" + _HL_START + ", StopSel=" + _HL_END + ", MaxFragments=2, MaxWords=24')"
+            " FROM resume_text, plainto_tsquery('english', :q) AS q"
+            " WHERE tsv @@ q ORDER BY rank DESC LIMIT :limit OFFSET :offset"
+        ), params).all()
+    else:
+        match = _fts5_query(user_query)
+        if not match:
+            return [], False
+        params["q"] = match
+        rows = db.session.execute(text(
+            "SELECT rowid, bm25(resume_fts) AS rank,"
+            " snippet(resume_fts, 0, '" + _HL_START + "', '" + _HL_END + "', ' … ', 24)"
+            " FROM resume_fts WHERE resume_fts MATCH :q"
+            " ORDER BY rank LIMIT :limit OFFSET :offset"
+        ), params).all()
+
+    results = [
+        {"application_id": row[0], "rank": float(row[1]), "snippet": _highlight(row[2])}
+        for row in rows[:per_page]
+    ]
+    return results, len(rows) > per_page
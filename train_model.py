@@ -5,49 +5,58 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score
 
-# Load dataset
-df = pd.read_csv("trained_dataset.csv")
+# Text feature settings shared with the job-description ranking engine
+VECTORIZER_PARAMS = {
+    "stop_words": "english",
+    "max_features": 5000,
+}
 
-# Safety check
-required_cols = {"resume", "shortlisted"}
-if not required_cols.issubset(df.columns):
-    raise Exception("CSV must contain resume & shortlisted columns")
 
-# Fill missing text
-df["resume"] = df["resume"].fillna("")
+def train():
+    # Load dataset
+    df = pd.read_csv("trained_dataset.csv")
 
-X_text = df["resume"]
-y = df["shortlisted"]
+    # Safety check
+    required_cols = {"resume", "shortlisted"}
+    if not required_cols.issubset(df.columns):
+        raise Exception("CSV must contain resume & shortlisted columns")
 
-# Convert resume text → numeric features
-vectorizer = TfidfVectorizer(
-    stop_words="english",
-    max_features=5000
-)
+    # Fill missing text
+    df["resume"] = df["resume"].fillna("")
 
-X = vectorizer.fit_transform(X_text)
+    X_text = df["resume"]
+    y = df["shortlisted"]
 
-# Train-test split
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
+    # Convert resume text → numeric features
+    vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
 
-# Train AI model
-model = RandomForestClassifier(
-    n_estimators=200,
-    random_state=42
-)
+    X = vectorizer.fit_transform(X_text)
 
-model.fit(X_train, y_train)
+    # Train-test split
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42
+    )
 
-# Evaluate
-y_pred = model.predict(X_test)
-accuracy = accuracy_score(y_test, y_pred)
+    # Train AI model
+    model = RandomForestClassifier(
+        n_estimators=200,
+        random_state=42
+    )
 
-print(f"✅ AI Model Accuracy: {accuracy:.2f}")
+    model.fit(X_train, y_train)
 
-# Save model & vectorizer
-joblib.dump(model, "ai_shortlist_model.pkl")
-joblib.dump(vectorizer, "resume_vectorizer.pkl")
+    # Evaluate
+    y_pred = model.predict(X_test)
+    accuracy = accuracy_score(y_test, y_pred)
 
-print("🎯 Resume AI trained & saved successfully")
+    print(f"✅ AI Model Accuracy: {accuracy:.2f}")
+
+    # Save model & vectorizer
+    joblib.dump(model, "ai_shortlist_model.pkl")
+    joblib.dump(vectorizer, "resume_vectorizer.pkl")
+
+    print("🎯 Resume AI trained & saved successfully")
+
+
+if __name__ == "__main__":
+    train()
\ No newline at end of file
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import metrics
+from model import db, User
+
+
+# -----------------------------------------
+# Immutable User Snapshot
+# -----------------------------------------
+class UserSnapshot(UserMixin, namedtuple("UserSnapshot", ["id", "email", "user_type"])):
+    """
+    Read-only view of a User used as `current_user`.
+    Holds only what request handling needs, so it is safe to share
+    between requests and threads.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(id=user.id, email=user.email, user_type=user.user_type)
+
+
+# -----------------------------------------
+# Per-Process LRU Cache with TTL
+# -----------------------------------------
+class UserCache:
+    """
+    Size-bounded LRU of UserSnapshot objects keyed by user id.
+    Entries expire after `ttl` seconds, which also bounds how stale another
+    process's copy can be after an update made elsewhere.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # user_id -> (expires_at, snapshot)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        user = db.session.get(User, user_id)
+        if user is None:
+            self.invalidate(user_id)
+            return None
+
+        snapshot = UserSnapshot.from_user(user)
+        with self._lock:
+            self._entries[user_id] = (now + self.ttl, snapshot)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return round(self.hits / total, 4) if total else 0.0
+
+
+user_cache = UserCache()
+
+metrics.register_gauge("user_cache.hits", lambda: user_cache.hits)
+metrics.register_gauge("user_cache.misses", lambda: user_cache.misses)
+metrics.register_gauge("user_cache.hit_rate", user_cache.hit_rate)
+metrics.register_gauge("user_cache.size", lambda: len(user_cache._entries))
+
+
+def init_app(app):
+    """Applies USER_CACHE_SIZE / USER_CACHE_TTL from the app config."""
+    user_cache.maxsize = app.config.get("USER_CACHE_SIZE", 1024)
+    user_cache.ttl = app.config.get("USER_CACHE_TTL", 60)
+
+
+# -----------------------------------------
+# Invalidation (password change, account update, delete)
+# -----------------------------------------
+# Ids are collected at flush and dropped from the cache only once the
+# transaction commits; invalidating at flush would let another request
+# re-cache the old row before the change is visible.
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(db_session, flush_context):
+    for obj in list(db_session.dirty) + list(db_session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            db_session.info.setdefault("changed_user_ids", set()).add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_users(db_session):
+    for user_id in db_session.info.pop("changed_user_ids", ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_changed_users(db_session, previous_transaction):
+    db_session.info.pop("changed_user_ids", None)
@@ -7,21 +7,20 @@ from docx import Document
 # -----------------------------------------
 # Resume Text Extraction
 # -----------------------------------------
-def extract_text_from_pdf(path: str) -> str:
-    """Extract text from PDF resume safely."""
+def extract_text_from_pdf(path) -> str:
+    """Extract text from PDF resume safely (file path or binary stream)."""
     text = ""
     try:
-        with open(path, "rb") as f:
-            reader = PdfReader(f)
-            for page in reader.pages:
-                text += page.extract_text() or ""
+        reader = PdfReader(path)
+        for page in reader.pages:
+            text += page.extract_text() or ""
     except Exception as e:
         print(f"PDF read error: {e}")
     return text
 
 
-def extract_text_from_docx(path: str) -> str:
-    """Extract text from DOCX resume safely."""
+def extract_text_from_docx(path) -> str:
+    """Extract text from DOCX resume safely (file path or binary stream)."""
     try:
         doc = Document(path)
         return "\n".join(p.text for p in doc.paragraphs)
@@ -59,6 +58,22 @@ def process_resume(path: str) -> str:
     return text
 
 
+def process_resume_stream(stream, filename: str) -> str:
+    """
+    Same as process_resume, for a resume that is not on disk
+    (e.g. an entry read straight out of a ZIP archive).
+    The file type is taken from `filename`.
+    """
+    if filename.lower().endswith(".pdf"):
+        text = extract_text_from_pdf(stream)
+    elif filename.lower().endswith(".docx"):
+        text = extract_text_from_docx(stream)
+    else:
+        return ""
+
+    return text.strip()
+
+
 # -----------------------------------------
 # Video Transcription (Mock)
 # -----------------------------------------